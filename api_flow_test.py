@@ -5,6 +5,7 @@ API 流程测试脚本（局域网无用户版）
 - 直接通过 HTTP 调用已运行的服务，不尝试进程内或直连数据库。
 - 运行本脚本前请先执行 `uv run python prepare_test_media.py`（或自定义的前置脚本）删除旧 DB/缩略图并恢复 `sample_media/`，随后手动启动后端。
 - 测试流程包含创建本地来源 + SMB 来源（禁用扫描）并完成初始化后的全链路校验。
+- 通用 HTTP 工具（Session、请求/日志、JSON 解析）统一从 `tests/_flow.py` 导入（连接与日志细节拆在 `tests/_flow_net.py`、`tests/_flow_log.py`），其他流程脚本可直接复用。
 
 运行方式：
     uv run python api_flow_test.py
@@ -14,32 +15,57 @@ API 流程测试脚本（局域网无用户版）
     - TEST_VERBOSE         设为 "0" 可静默
     - TEST_SKIP_RESET      设为 "1" 时跳过 POST /settings/reset-initialization
     - TEST_SKIP_BOOTSTRAP  设为 "1" 时跳过媒体根/来源扫描，仅做接口验证
+    - TEST_REUSE_FIXTURE   设为 "1" 时启用引导缓存（见下文），默认每次都完整引导
     - TEST_SAMPLE_DIR      覆盖示例媒体目录（默认 repo 根的 sample_media/）
     - TEST_SCAN_TIMEOUT    扫描等待秒数（默认 120）
-    - TEST_SCAN_POLL       扫描状态轮询间隔（默认 0.5 秒）
+    - TEST_SEED            推荐流使用的 seed（默认固定为 test-1，保证多次运行顺序一致）
     - TEST_SMB_HOST/SHARE  若需测试 SMB 来源，可通过这些变量覆盖默认 NAS 参数
+
+引导缓存（仅 TEST_REUSE_FIXTURE=1 时启用）：
+    引导成功后会在仓库根写入 `.test_fixture_ok`（记录示例目录 mtime、已索引数量与来源信息）。
+    下次运行若示例目录未变化且后端仍为 completed 且索引数量一致，则跳过重置与扫描；删除该文件即可强制重新引导。
 """
 
 from __future__ import annotations
 
 import json
 import os
-import random
-import string
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
-from urllib import error, parse, request
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+
+from tests._flow import (
+    SESSION,
+    VERBOSE,
+    assert_true,
+    build_url,
+    emit,
+    get_base_url,
+    header_contains,
+    http_call,
+    http_json,
+    http_json_cached,
+    pin_resolved_host,
+    response_json,
+    select_base_url,
+    set_base_url,
+)
 
-BASE_URL = os.environ.get("API_BASE_URL", "http://127.0.0.1:8000")
-VERBOSE = os.environ.get("TEST_VERBOSE", "1") != "0"
 SKIP_RESET = os.environ.get("TEST_SKIP_RESET", "0") == "1"
 SKIP_BOOTSTRAP = os.environ.get("TEST_SKIP_BOOTSTRAP", "0") == "1"
+REUSE_FIXTURE = os.environ.get("TEST_REUSE_FIXTURE", "0") == "1"
 SCAN_TIMEOUT = int(os.environ.get("TEST_SCAN_TIMEOUT", "120"))
-SCAN_POLL_INTERVAL = float(os.environ.get("TEST_SCAN_POLL", "0.5"))
+SESSION_SEED = os.environ.get("TEST_SEED", "test-1")
+# 模块加载时一次性 resolve；后续断言直接比较字符串，不再对示例目录重复 resolve
 SAMPLE_DIR = Path(
     os.environ.get("TEST_SAMPLE_DIR") or (Path(__file__).resolve().parent / "sample_media")
 ).expanduser().resolve()
+# TEST_REUSE_FIXTURE=1 时引导成功后写入的哨兵：示例目录与后端索引都没变化时，下次运行跳过重置/扫描
+FIXTURE_SENTINEL = Path(__file__).resolve().parent / ".test_fixture_ok"
 
 _DEFAULT_SMB_HOST = os.environ.get("TEST_SMB_HOST", "10.203.230.77").strip()
 _DEFAULT_SMB_SHARE = os.environ.get("TEST_SMB_SHARE", "PublicShare").strip() or "PublicShare"
@@ -55,156 +81,9 @@ else:
     SMB_ANONYMOUS = _SMB_ANON_ENV.strip().lower() not in {"0", "false", "no", "off"}
 
 
-# ---------------------------------------------------------------------------
-# 通用 HTTP 工具
-# ---------------------------------------------------------------------------
-
-def _get_lan_ip() -> str:
-    import socket
-
-    ip = "127.0.0.1"
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-        finally:
-            s.close()
-    except Exception:
-        try:
-            ip = socket.gethostbyname(socket.gethostname())
-        except Exception:
-            pass
-    return ip
-
-
-def _probe_health(base: str, timeout: float = 1.5) -> bool:
-    try:
-        url = f"{base}/health"
-        req = request.Request(url=url, method="GET", headers={"Accept": "application/json"})
-        with request.urlopen(req, timeout=timeout) as resp:
-            return 200 <= resp.getcode() < 300
-    except Exception:
-        return False
-
-
-def _select_base_url(initial: str) -> str:
-    env = os.environ.get("API_BASE_URL")
-    if env:
-        return env.rstrip("/")
-    candidates = [
-        initial.rstrip("/"),
-        "http://localhost:8000",
-        f"http://{_get_lan_ip()}:8000",
-    ]
-    for base in candidates:
-        if _probe_health(base):
-            return base
-    return initial.rstrip("/")
-
-
-def build_url(path: str, query: Optional[Dict[str, Any]] = None) -> str:
-    if query:
-        return f"{BASE_URL}{path}?{parse.urlencode(query)}"
-    return f"{BASE_URL}{path}"
-
-
-def log_request(title: str, method: str, path: str, query: Optional[Dict[str, Any]] = None, body: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> None:
-    if not VERBOSE:
-        return
-    print("\n=== REQUEST:")
-    print(f"- Title   : {title}")
-    print(f"- Method  : {method}")
-    print(f"- Path    : {path}")
-    if query:
-        print(f"- Query   : {json.dumps(query, ensure_ascii=False)}")
-    if body is not None:
-        print(f"- JSON    : {json.dumps(body, ensure_ascii=False)}")
-    if headers:
-        print(f"- Headers : {headers}")
-
-
-def log_response(resp, body_bytes: bytes) -> None:
-    if not VERBOSE:
-        return
-    print("=== RESPONSE:")
-    status = getattr(resp, "status", getattr(resp, "code", None)) or resp.getcode()
-    print(f"- Status  : {status}")
-    ctype = resp.headers.get("Content-Type", "") if hasattr(resp, "headers") else ""
-    print(f"- Headers : Content-Type={ctype}")
-    try:
-        text = body_bytes.decode("utf-8")
-        obj = json.loads(text)
-        print("- JSON    :")
-        print(json.dumps(obj, ensure_ascii=False, indent=2))
-    except Exception:
-        print(f"- Bytes   : length={len(body_bytes)}")
-
-
-def http_call(
-    title: str,
-    method: str,
-    path: str,
-    query: Optional[Dict[str, Any]] = None,
-    json_body: Optional[Dict[str, Any]] = None,
-    headers: Optional[Dict[str, str]] = None,
-    allow_error: bool = False,
-):
-    log_request(title, method, path, query, json_body, headers)
-    url = build_url(path, query)
-    data = None
-    hdrs = {"Accept": "application/json"}
-    if json_body is not None:
-        data = json.dumps(json_body).encode("utf-8")
-        hdrs["Content-Type"] = "application/json"
-    if headers:
-        hdrs.update(headers)
-    req = request.Request(url=url, method=method, data=data, headers=hdrs)
-    try:
-        with request.urlopen(req, timeout=30) as resp:
-            body = resp.read() if method.upper() != "HEAD" else b""
-            log_response(resp, body)
-            return resp, body
-    except error.HTTPError as e:
-        body = e.read()
-        if VERBOSE:
-            print("=== RESPONSE (HTTPError):")
-            print(f"- Status  : {e.code}")
-            print(f"- Reason  : {e.reason}")
-            print(f"- Body    : {body.decode('utf-8', errors='ignore')}")
-        if allow_error:
-            e.headers = getattr(e, "headers", {})
-            return e, body
-        raise
-
-
-def assert_true(cond: bool, msg: str) -> None:
-    if not cond:
-        raise AssertionError(msg)
-
-
-def header_contains(resp, key: str, substr: str) -> bool:
-    val = resp.headers.get(key) if hasattr(resp, "headers") else None
-    if val is None:
-        return False
-    return substr.lower() in str(val).lower()
-
-
-def _status_code(resp) -> int:
-    return int(getattr(resp, "status", getattr(resp, "code", None)) or resp.getcode())
-
-
-def _decode_json(body: bytes) -> Any:
-    return json.loads(body.decode("utf-8"))
-
-
-def _random_seed(length: int = 16) -> str:
-    alphabet = string.ascii_lowercase + string.digits
-    rand = "".join(random.choice(alphabet) for _ in range(length))
-    return f"seed-{int(time.time())}-{rand}"
-
-
+@lru_cache(maxsize=256)
 def _normalize_local_path(candidate: str) -> str:
+    # 同一路径在流程中反复比对，resolve 的系统调用结果按字符串缓存
     try:
         return str(Path(candidate).expanduser().resolve())
     except Exception:
@@ -213,13 +92,8 @@ def _normalize_local_path(candidate: str) -> str:
 
 def fetch_init_status(skip_auto_restore: bool = False) -> Dict[str, Any]:
     query = {"skip_auto_restore": "true"} if skip_auto_restore else None
-    _, body = http_call(
-        title="Initialization Status",
-        method="GET",
-        path="/init-status",
-        query=query,
-    )
-    return _decode_json(body)
+    _, data = http_json_cached("Initialization Status", "/init-status", query)
+    return data
 
 
 def ensure_init_state(
@@ -246,12 +120,12 @@ def ensure_init_state(
 def reset_backend_state() -> None:
     if SKIP_RESET:
         if VERBOSE:
-            print("[reset] 跳过后端重置 (TEST_SKIP_RESET=1)")
+            emit("[reset] 跳过后端重置 (TEST_SKIP_RESET=1)")
         return
     db_path = Path(__file__).resolve().parent / "media_app.db"
     if not db_path.exists():
         if VERBOSE:
-            print("[reset] 检测到数据库文件不存在，跳过 reset 调用，等待后端自动初始化。")
+            emit("[reset] 检测到数据库文件不存在，跳过 reset 调用，等待后端自动初始化。")
         return
     resp, _ = http_call(
         title="Reset Initialization",
@@ -259,28 +133,42 @@ def reset_backend_state() -> None:
         path="/settings/reset-initialization",
         allow_error=True,
     )
-    code = _status_code(resp)
+    code = resp.status_code
     if code == 404:
-        print("[reset] 服务未实现 /settings/reset-initialization，继续后续流程。")
+        emit("[reset] 服务未实现 /settings/reset-initialization，继续后续流程。")
     elif code >= 400:
         raise RuntimeError(f"重置失败: HTTP {code}")
     else:
         if VERBOSE:
-            print("[reset] 数据库已清空，可重新初始化。")
+            emit("[reset] 数据库已清空，可重新初始化。")
         ensure_init_state("idle", skip_auto_restore=True)
 
 
 def validate_local_source(sample_dir: Path) -> None:
     payload = {"type": "local", "path": str(sample_dir)}
-    _, body = http_call(
+    _, data = http_json(
         title="Validate Local Source",
         method="POST",
         path="/setup/source/validate",
         json_body=payload,
     )
-    data = _decode_json(body)
     assert_true(data.get("ok") and data.get("readable"), "本地来源校验失败")
-    assert_true(Path(data.get("absPath")).resolve() == sample_dir, "absPath 不匹配示例目录")
+    # 服务端返回的 absPath 已是 resolve 后的绝对路径，直接与预先 resolve 的示例目录比较
+    assert_true(data.get("absPath") == str(sample_dir), "absPath 不匹配示例目录")
+
+
+def _wait_for_init_settled() -> None:
+    """media-root 返回 202 后首批导入在后台进行，轮询 init-status 直到不再是 running。"""
+    deadline = time.monotonic() + SCAN_TIMEOUT
+    delay = 0.02
+    while time.monotonic() < deadline:
+        resp, body = http_call(title="Initialization Status", method="GET", path="/init-status", quiet=True)
+        state = str(response_json(resp, body).get("state", "")).lower()
+        if state != "running":
+            return
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    raise RuntimeError("等待媒体库初始化超时")
 
 
 def set_media_root(sample_dir: Path) -> None:
@@ -295,10 +183,11 @@ def set_media_root(sample_dir: Path) -> None:
             json_body=payload,
             allow_error=True,
         )
-        code = _status_code(resp)
+        code = resp.status_code
         if 200 <= code < 300:
-            data = _decode_json(body)
+            data = response_json(resp, body)
             assert_true(data.get("success") is True, f"设置媒体根路径失败: {data}")
+            _wait_for_init_settled()
             return
         last_error = f"HTTP {code}"
         if code in (404, 405):
@@ -308,19 +197,13 @@ def set_media_root(sample_dir: Path) -> None:
 
 def list_media_sources(include_inactive: bool = False) -> list[Dict[str, Any]]:
     query = {"include_inactive": "true" if include_inactive else "false"}
-    _, body = http_call(
-        title="List Media Sources",
-        method="GET",
-        path="/media-sources",
-        query=query,
-    )
-    data = _decode_json(body)
+    _, data = http_json_cached("List Media Sources", "/media-sources", query)
     assert_true(isinstance(data, list), "媒体来源返回值不是列表")
     return data
 
 
 def ensure_media_source(sample_dir: Path) -> Dict[str, Any]:
-    normalized = _normalize_local_path(str(sample_dir))
+    normalized = str(sample_dir)
     sources = list_media_sources()
     for src in sources:
         root = _normalize_local_path(src.get("rootPath", ""))
@@ -332,13 +215,12 @@ def ensure_media_source(sample_dir: Path) -> Dict[str, Any]:
         "displayName": "sample_media",
         "scan": True,
     }
-    _, body = http_call(
+    _, data = http_json(
         title="Create Local Source",
         method="POST",
         path="/setup/source",
         json_body=payload,
     )
-    data = _decode_json(body)
     assert_true(data.get("id") is not None, "创建媒体来源失败")
     return data
 
@@ -348,7 +230,7 @@ def create_smb_source_stub() -> Optional[int]:
     share = _DEFAULT_SMB_SHARE
     if not host or not share:
         if VERBOSE:
-            print("[smb] 未配置 TEST_SMB_HOST/SHARE，跳过 SMB 来源测试。")
+            emit("[smb] 未配置 TEST_SMB_HOST/SHARE，跳过 SMB 来源测试。")
         return None
 
     validate_payload: Dict[str, Any] = {
@@ -372,9 +254,9 @@ def create_smb_source_stub() -> Optional[int]:
         json_body=validate_payload,
         allow_error=True,
     )
-    v_code = _status_code(v_resp)
+    v_code = v_resp.status_code
     if 200 <= v_code < 300:
-        v_data = _decode_json(v_body)
+        v_data = response_json(v_resp, v_body)
         assert_true(v_data.get("ok"), "SMB 来源校验失败")
     elif v_code == 404:
         raise RuntimeError("SMB 来源校验失败：无法连接到 NAS")
@@ -412,12 +294,12 @@ def create_smb_source_stub() -> Optional[int]:
         json_body=payload,
         allow_error=True,
     )
-    code = _status_code(resp)
+    code = resp.status_code
     if 200 <= code < 300:
-        data = _decode_json(body)
+        data = response_json(resp, body)
         assert_true(data.get("id") is not None, "SMB 来源未返回 id")
         if VERBOSE:
-            print(f"[smb] SMB 来源已创建，id={data['id']}")
+            emit(f"[smb] SMB 来源已创建，id={data['id']}")
         return int(data["id"])
     if code == 409:
         existing = list_media_sources(include_inactive=True)
@@ -427,40 +309,36 @@ def create_smb_source_stub() -> Optional[int]:
             root = str(src.get("rootPath") or "").lower()
             if host.lower() in root and share.lower() in root:
                 if VERBOSE:
-                    print(f"[smb] SMB 来源已存在，复用 id={src.get('id')}")
+                    emit(f"[smb] SMB 来源已存在，复用 id={src.get('id')}")
                 return int(src.get("id"))
     raise RuntimeError(f"创建 SMB 来源失败: HTTP {code}")
 
 
 def check_filesystem_endpoints(sample_dir: Path) -> None:
-    _, roots_body = http_call(title="Filesystem Roots", method="GET", path="/filesystem/roots")
-    roots = _decode_json(roots_body)
+    _, roots = http_json(title="Filesystem Roots", method="GET", path="/filesystem/roots")
     assert_true(isinstance(roots, list) and len(roots) > 0, "filesystem/roots 应返回非空列表")
 
-    _, list_body = http_call(
+    _, listing = http_json(
         title="Filesystem List",
         method="GET",
         path="/filesystem/list",
         query={"path": str(sample_dir)},
     )
-    listing = _decode_json(list_body)
     current_path = _normalize_local_path(listing.get("current_path", ""))
-    assert_true(current_path == _normalize_local_path(str(sample_dir)), "filesystem/list 路径不匹配")
+    assert_true(current_path == str(sample_dir), "filesystem/list 路径不匹配")
     assert_true(isinstance(listing.get("entries"), list), "filesystem/list entries 应为列表")
 
-    _, common_body = http_call(title="Common Folders", method="GET", path="/filesystem/common-folders")
-    commons = _decode_json(common_body)
+    _, commons = http_json(title="Common Folders", method="GET", path="/filesystem/common-folders")
     assert_true(isinstance(commons, list), "filesystem/common-folders 应返回列表")
 
 
 def check_os_info_and_permissions(sample_dir: Path) -> None:
-    _, os_body = http_call(
+    _, info = http_json(
         title="OS Info",
         method="GET",
         path="/os-info",
         query={"refresh": "true"},
     )
-    info = _decode_json(os_body)
     assert_true(isinstance(info.get("os"), str) and info["os"], "os-info 未返回操作系统")
     assert_true(isinstance(info.get("lan_ips"), list), "os-info lan_ips 应为列表")
     assert_true(isinstance(info.get("port"), int), "os-info port 应为整数")
@@ -471,21 +349,19 @@ def check_os_info_and_permissions(sample_dir: Path) -> None:
             str(sample_dir / "__missing_test_path__"),
         ]
     }
-    _, probe_body = http_call(
+    _, results = http_json(
         title="Permissions Probe",
         method="POST",
         path="/permissions/probe",
         json_body=probe_payload,
     )
-    results = _decode_json(probe_body)
     assert_true(len(results) >= 2, "权限探测应返回所有路径结果")
     first_status = str(results[0].get("status", ""))
     assert_true(first_status in {"ok", "denied"}, "权限探测返回异常状态")
 
 
 def check_scan_progress(sample_dir: Path) -> None:
-    _, body = http_call(title="Scan Progress", method="GET", path="/tasks/scan-progress")
-    stats = _decode_json(body)
+    _, stats = http_json(title="Scan Progress", method="GET", path="/tasks/scan-progress")
     state = str(stats.get("state", ""))
     assert_true(state in {"no_media_root", "ready", "error"}, f"未知任务状态: {state}")
     if SKIP_BOOTSTRAP:
@@ -494,14 +370,13 @@ def check_scan_progress(sample_dir: Path) -> None:
     reported_path = stats.get("media_root_path")
     assert_true(reported_path, "ready 状态必须返回媒体根路径")
     assert_true(
-        _normalize_local_path(str(reported_path)) == _normalize_local_path(str(sample_dir)),
+        _normalize_local_path(str(reported_path)) == str(sample_dir),
         "scan-progress 媒体根不匹配",
     )
 
 
 def check_auto_scan_settings() -> None:
-    _, status_body = http_call(title="Auto Scan Status", method="GET", path="/settings/auto-scan")
-    status = _decode_json(status_body)
+    _, status = http_json(title="Auto Scan Status", method="GET", path="/settings/auto-scan")
     enabled = bool(status.get("enabled"))
     payload: Dict[str, Any] = {"enabled": enabled}
     if enabled:
@@ -512,34 +387,38 @@ def check_auto_scan_settings() -> None:
             payload["scan_mode"] = status["scan_mode"]
         if status.get("scan_interval"):
             payload["scan_interval"] = status["scan_interval"]
-    _, update_body = http_call(
+    _, updated = http_json(
         title="Auto Scan Update",
         method="POST",
         path="/settings/auto-scan",
         json_body=payload,
     )
-    updated = _decode_json(update_body)
     assert_true(updated.get("enabled") == enabled, "自动扫描更新后状态不一致")
 
 
 def exercise_network_endpoints() -> None:
-    resp_missing_host, _ = http_call(
-        title="Network Discover Missing Host",
-        method="POST",
-        path="/network/discover",
-        json_body={"host": "", "anonymous": True},
-        allow_error=True,
-    )
-    assert_true(_status_code(resp_missing_host) == 422, "缺少 host 应返回 422")
-
-    resp_missing_share, _ = http_call(
-        title="Network Browse Missing Share",
-        method="POST",
-        path="/network/browse",
-        json_body={"host": "198.51.100.10", "share": ""},
-        allow_error=True,
-    )
-    assert_true(_status_code(resp_missing_share) == 422, "缺少 share 应返回 422")
+    # 两个校验探针互不依赖，同时发出后再统一断言
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        fut_host = pool.submit(
+            http_call,
+            title="Network Discover Missing Host",
+            method="POST",
+            path="/network/discover",
+            json_body={"host": "", "anonymous": True},
+            allow_error=True,
+        )
+        fut_share = pool.submit(
+            http_call,
+            title="Network Browse Missing Share",
+            method="POST",
+            path="/network/browse",
+            json_body={"host": "198.51.100.10", "share": ""},
+            allow_error=True,
+        )
+        resp_missing_host, _ = fut_host.result()
+        resp_missing_share, _ = fut_share.result()
+    assert_true(resp_missing_host.status_code == 422, "缺少 host 应返回 422")
+    assert_true(resp_missing_share.status_code == 422, "缺少 share 应返回 422")
 
 
 def exercise_media_source_lifecycle(source_ids: list[Optional[int]]) -> None:
@@ -557,54 +436,115 @@ def exercise_media_source_lifecycle(source_ids: list[Optional[int]]) -> None:
         assert_true(deleted is not None, f"删除来源 {source_id} 后应能在列表中找到")
         assert_true(deleted.get("status") != "active", f"来源 {source_id} 删除后应标记为 inactive")
 
-        _, restored_body = http_call(
+        _, restored = http_json(
             title=f"Restore Media Source {source_id}",
             method="POST",
             path=f"/media-sources/{source_id}/restore",
         )
-        restored = _decode_json(restored_body)
         assert_true(restored.get("status") == "active", f"来源 {source_id} 恢复后应重新激活")
 
 
 def start_scan_job(source_id: int) -> str:
-    _, body = http_call(
+    _, data = http_json(
         title="Start Scan",
         method="POST",
         path="/scan/start",
         query={"source_id": source_id},
     )
-    data = _decode_json(body)
     job_id = data.get("jobId")
     assert_true(job_id is not None, "scan/start 未返回 jobId")
     return str(job_id)
 
 
+def _log_scan_state(job_id: str, data: Dict[str, Any], last_state: Optional[str]) -> Optional[str]:
+    state = data.get("state", "unknown")
+    if VERBOSE and state != last_state:
+        emit(f"[scan] job={job_id} state={state} scanned={data.get('scannedCount')}")
+    return state
+
+
 def wait_for_scan(job_id: str) -> Dict[str, Any]:
-    deadline = time.time() + SCAN_TIMEOUT
-    last_state = None
-    while time.time() < deadline:
-        _, body = http_call(
-            title="Scan Status",
-            method="GET",
-            path="/scan/status",
-            query={"job_id": job_id},
-        )
-        data = _decode_json(body)
-        state = data.get("state", "unknown")
-        if VERBOSE and state != last_state:
-            print(f"[scan] job={job_id} state={state} scanned={data.get('scannedCount')}")
-            last_state = state
-        if state in {"completed", "failed"}:
-            return data
-        time.sleep(SCAN_POLL_INTERVAL)
-    raise TimeoutError(f"扫描任务 {job_id} 超时未完成")
+    """订阅 /events/scan，任务进入 completed/failed 即返回。"""
+    url = build_url("/events/scan", {"job_id": job_id})
+    deadline = time.monotonic() + SCAN_TIMEOUT
+    last_state: Optional[str] = None
+    with SESSION.get(url, headers={"Accept": "text/event-stream"}, stream=True, timeout=SCAN_TIMEOUT) as resp:
+        assert_true(resp.status_code == 200, f"订阅扫描事件失败: HTTP {resp.status_code}")
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = orjson.loads(line[len("data:"):])
+            last_state = _log_scan_state(job_id, data, last_state)
+            if last_state in {"completed", "failed"}:
+                return data
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"扫描任务 {job_id} 超时未完成")
+    raise RuntimeError(f"扫描事件流在任务 {job_id} 结束前关闭（最后状态 {last_state}）")
+
+
+def _media_tree_mtime(sample_dir: Path) -> int:
+    """目录树内所有目录的最大 mtime（文件增删会改变其父目录 mtime）。"""
+    latest = sample_dir.stat().st_mtime_ns
+    for root, _dirs, _files in os.walk(sample_dir):
+        latest = max(latest, os.stat(root).st_mtime_ns)
+    return latest
+
+
+def _fixture_fingerprint(sample_dir: Path) -> Dict[str, Any]:
+    return {
+        "base_url": get_base_url(),
+        "media_root": str(sample_dir),
+        "media_dir_mtime": _media_tree_mtime(sample_dir),
+    }
+
+
+def _indexed_media_count() -> int:
+    _, stats = http_json(title="Scan Progress (fixture)", method="GET", path="/tasks/scan-progress")
+    return int(stats.get("scanned_count") or 0)
+
+
+def _load_fresh_fixture(sample_dir: Path) -> Optional[Dict[str, Any]]:
+    """哨兵与示例目录、后端状态都一致时返回上次引导得到的来源，否则返回 None。"""
+    if not FIXTURE_SENTINEL.exists():
+        return None
+    try:
+        saved = json.loads(FIXTURE_SENTINEL.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    fingerprint = _fixture_fingerprint(sample_dir)
+    if any(saved.get(key) != value for key, value in fingerprint.items()):
+        return None
+    status = fetch_init_status()
+    if str(status.get("state", "")).lower() != "completed":
+        return None
+    if _normalize_local_path(str(status.get("media_root_path") or "")) != str(sample_dir):
+        return None
+    if _indexed_media_count() != saved.get("row_count"):
+        return None
+    source = saved.get("source")
+    return source if isinstance(source, dict) else None
+
+
+def _save_fixture(sample_dir: Path, source: Dict[str, Any]) -> None:
+    payload = _fixture_fingerprint(sample_dir)
+    payload["row_count"] = _indexed_media_count()
+    payload["source"] = source
+    FIXTURE_SENTINEL.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
 
 
 def bootstrap_media_library(sample_dir: Path) -> Dict[str, Any]:
     if SKIP_BOOTSTRAP:
-        print("[bootstrap] 跳过媒体初始化 (TEST_SKIP_BOOTSTRAP=1)")
+        emit("[bootstrap] 跳过媒体初始化 (TEST_SKIP_BOOTSTRAP=1)")
         return {}
     assert_true(sample_dir.exists(), f"示例目录不存在: {sample_dir}")
+    # 默认每次完整引导：重置、来源校验、媒体根设置、扫描与 SSE 都是本脚本要覆盖的接口
+    if REUSE_FIXTURE:
+        cached = _load_fresh_fixture(sample_dir)
+        if cached is not None:
+            if VERBOSE:
+                emit(f"[bootstrap] 示例目录与后端索引未变化，复用上次引导结果 ({FIXTURE_SENTINEL.name})")
+            return cached
+    FIXTURE_SENTINEL.unlink(missing_ok=True)
     reset_backend_state()
     validate_local_source(sample_dir)
     set_media_root(sample_dir)
@@ -612,6 +552,8 @@ def bootstrap_media_library(sample_dir: Path) -> Dict[str, Any]:
     job_id = start_scan_job(int(source["id"]))
     result = wait_for_scan(job_id)
     assert_true(result.get("state") == "completed", f"扫描任务失败: {result}")
+    if REUSE_FIXTURE:
+        _save_fixture(sample_dir, source)
     return source
 
 
@@ -619,11 +561,22 @@ def bootstrap_media_library(sample_dir: Path) -> Dict[str, Any]:
 # 主流程
 # ---------------------------------------------------------------------------
 
+def _run_concurrently(*checks: Callable[[], None]) -> None:
+    """并发执行互不依赖的只读检查；任一失败时按提交顺序抛出首个异常。"""
+    with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        futures = [pool.submit(check) for check in checks]
+    for fut in futures:
+        fut.result()
+
+
 def run_media_flow() -> None:
     sample_dir = SAMPLE_DIR
-    check_filesystem_endpoints(sample_dir)
-    check_os_info_and_permissions(sample_dir)
-    exercise_network_endpoints()
+    # 预检探针互不依赖，并发发出：耗时从各 RTT 之和降为最慢的一个
+    _run_concurrently(
+        lambda: check_filesystem_endpoints(sample_dir),
+        lambda: check_os_info_and_permissions(sample_dir),
+        exercise_network_endpoints,
+    )
 
     source_info = bootstrap_media_library(sample_dir)
     if SKIP_BOOTSTRAP:
@@ -631,8 +584,7 @@ def run_media_flow() -> None:
     else:
         ensure_init_state("completed", media_root=sample_dir)
 
-    check_scan_progress(sample_dir)
-    check_auto_scan_settings()
+    _run_concurrently(lambda: check_scan_progress(sample_dir), check_auto_scan_settings)
 
     smb_source_id = create_smb_source_stub()
     if smb_source_id is not None:
@@ -642,7 +594,7 @@ def run_media_flow() -> None:
             "SMB 来源未出现在媒体来源列表中",
         )
 
-    normalized_sample = _normalize_local_path(str(sample_dir))
+    normalized_sample = str(sample_dir)
     lifecycle_source_id: Optional[int] = None
     if isinstance(source_info, dict) and source_info.get("id") is not None:
         lifecycle_source_id = int(source_info["id"])
@@ -659,82 +611,96 @@ def run_media_flow() -> None:
             if fallback_id is not None:
                 lifecycle_source_id = int(fallback_id)
 
-    # 生成本地种子，兼容无需 /session 的架构
-    session_seed = _random_seed()
+    # 固定种子：每次运行的 seeded 顺序一致，后端按 seed 缓存的排序参数也能复用
+    session_seed = SESSION_SEED
     if VERBOSE:
-        print(f"[seed] 使用本地生成的 session_seed={session_seed}")
-
-    # 1) 基础健康检查
-    http_call(title="Health", method="GET", path="/health")
+        emit(f"[seed] 使用固定 session_seed={session_seed}")
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        # 1) 健康检查 + 不依赖首屏结果的列表请求（预取 / recent / 缺 seed）先行发出，与首屏分页并行
+        fut_health = pool.submit(http_call, title="Health", method="GET", path="/health")
+        fut_prefetch = pool.submit(
+            http_call,
+            title="Media List Prefetch",
+            method="GET",
+            path="/media-list",
+            query={"seed": session_seed, "offset": 5, "limit": 5, "order": "seeded"},
+        )
+        fut_recent = pool.submit(
+            http_call,
+            title="Media List Recent",
+            method="GET",
+            path="/media-list",
+            query={"seed": session_seed, "offset": 0, "limit": 3, "order": "recent"},
+        )
+        fut_bad = pool.submit(
+            http_call,
+            title="Media List Missing Seed",
+            method="GET",
+            path="/media-list",
+            query={"offset": 0, "limit": 1},
+            allow_error=True,
+        )
 
-    # 2) 推荐流分页
-    _, body = http_call(
-        title="Media List (seeded)",
-        method="GET",
-        path="/media-list",
-        query={"seed": session_seed, "offset": 0, "limit": 5, "order": "seeded"},
-    )
-    page = _decode_json(body)
-    items = page.get("items", [])
-    assert_true(len(items) > 0, "应至少返回一个媒体项")
-    first_id = items[0]["id"]
-
-    # 3) 拉取原资源
-    r_media, _ = http_call(
-        title="Media Resource",
-        method="GET",
-        path=f"/media-resource/{first_id}",
-    )
+        # 2) 推荐流分页
+        _, page = http_json(
+            title="Media List (seeded)",
+            method="GET",
+            path="/media-list",
+            query={"seed": session_seed, "offset": 0, "limit": 5, "order": "seeded"},
+        )
+        items = page.get("items", [])
+        assert_true(len(items) > 0, "应至少返回一个媒体项")
+        first_id = items[0]["id"]
+
+        # 3) 原资源 / 缩略图只依赖 first_id，拿到首屏后立即并发发出
+        media_path = f"/media-resource/{first_id}"
+        fut_media = pool.submit(
+            http_call, title="Media Resource", method="GET", path=media_path, max_bytes=0
+        )
+        fut_thumb = pool.submit(http_call, title="Media Thumbnail", method="GET", path=f"/media/{first_id}/thumbnail")
+        # Range 探测与标签列表同样只读、只依赖 first_id，一并提前发出；结果在对应步骤里再断言
+        fut_range = pool.submit(
+            http_call,
+            title="Media Range 0-1023",
+            method="GET",
+            path=media_path,
+            headers={"Range": "bytes=0-1023"},
+            allow_error=True,
+            max_bytes=1024,
+        )
+        fut_416 = pool.submit(
+            http_call,
+            title="Media Range Invalid",
+            method="GET",
+            path=media_path,
+            headers={"Range": "bytes=999999999-1000000000"},
+            allow_error=True,
+            max_bytes=0,
+        )
+        fut_tags = pool.submit(http_json_cached, "List Tags", "/tags")
+        fut_health.result()
+        fut_prefetch.result()
+        fut_recent.result()
+        r_bad, _ = fut_bad.result()
+        r_media, _ = fut_media.result()
+        r_thumb, thumb_bytes = fut_thumb.result()
+        r_range, range_body = fut_range.result()
+        r_416, _ = fut_416.result()
+        _, tags_payload = fut_tags.result()
+
+    # /media-resource 只提供 GET，Range 支持直接由 GET 的响应头校验
     assert_true(header_contains(r_media, "Accept-Ranges", "bytes"), "媒体资源应支持 Range")
 
-    # 3.1) HEAD
-    r_head, _ = http_call(
-        title="Media Resource HEAD",
-        method="HEAD",
-        path=f"/media-resource/{first_id}",
-        allow_error=True,
-    )
-    code = _status_code(r_head)
-    if 200 <= code < 300:
-        assert_true(header_contains(r_head, "Accept-Ranges", "bytes"), "HEAD 响应应包含 Range 头")
-
-    # 4) 预取与 recent 排序
-    http_call(
-        title="Media List Prefetch",
-        method="GET",
-        path="/media-list",
-        query={"seed": session_seed, "offset": 5, "limit": 5, "order": "seeded"},
-    )
-    http_call(
-        title="Media List Recent",
-        method="GET",
-        path="/media-list",
-        query={"seed": session_seed, "offset": 0, "limit": 3, "order": "recent"},
-    )
-
-    # 5) 缩略图
-    r_thumb, thumb_bytes = http_call(
-        title="Media Thumbnail",
-        method="GET",
-        path=f"/media/{first_id}/thumbnail",
-    )
+    # 3.2) 缩略图
     ctype = r_thumb.headers.get("Content-Type", "")
     assert_true(ctype.startswith("image/"), f"缩略图 Content-Type 异常: {ctype}")
     assert_true(len(thumb_bytes) > 0, "缩略图响应为空")
 
-    # 6) 缺 seed 触发 400
-    r_bad, _ = http_call(
-        title="Media List Missing Seed",
-        method="GET",
-        path="/media-list",
-        query={"offset": 0, "limit": 1},
-        allow_error=True,
-    )
-    assert_true(_status_code(r_bad) == 400, "缺少 seed 应返回 400")
+    # 4) 缺 seed 触发 400
+    assert_true(r_bad.status_code == 400, "缺少 seed 应返回 400")
 
     # 7) 标签列表 + 点赞
-    _, body = http_call(title="List Tags", method="GET", path="/tags")
-    tags_payload = _decode_json(body)
     tags = tags_payload.get("tags", [])
     assert_true("like" in tags and "favorite" in tags, "基础标签缺失 like/favorite")
     chosen_tag = "like"
@@ -747,13 +713,13 @@ def run_media_flow() -> None:
         json_body={"media_id": first_id, "tag": chosen_tag},
         allow_error=True,
     )
-    code = _status_code(r_add)
+    code = r_add.status_code
     if code >= 400:
         text = body.decode("utf-8", errors="ignore")
         if "read-only" in text.lower():
             skip_tag_tests = True
             if VERBOSE:
-                print("[tag] 后端为只读，跳过标签测试。")
+                emit("[tag] 后端为只读，跳过标签测试。")
         else:
             raise RuntimeError(f"Add Tag failed: HTTP {code} {text}")
 
@@ -765,7 +731,7 @@ def run_media_flow() -> None:
             json_body={"media_id": first_id, "tag": chosen_tag},
             allow_error=True,
         )
-        assert_true(_status_code(r_dup) == 409, "重复点赞应返回 409")
+        assert_true(r_dup.status_code == 409, "重复点赞应返回 409")
 
     http_call(
         title="Media List By Tag",
@@ -783,28 +749,14 @@ def run_media_flow() -> None:
         )
 
     # 8) Range 请求
-    r_range, body = http_call(
-        title="Media Range 0-1023",
-        method="GET",
-        path=f"/media-resource/{first_id}",
-        headers={"Range": "bytes=0-1023"},
-        allow_error=True,
-    )
-    code = _status_code(r_range)
+    code = r_range.status_code
     if code == 206:
         cr = r_range.headers.get("Content-Range", "")
         assert_true(cr.startswith("bytes 0-"), f"Content-Range 异常: {cr}")
         clen = int(r_range.headers.get("Content-Length", "0") or 0)
-        assert_true(clen == len(body), "Content-Length 与响应体长度不一致")
+        assert_true(clen == len(range_body), "Content-Length 与响应体长度不一致")
 
-    r_416, _ = http_call(
-        title="Media Range Invalid",
-        method="GET",
-        path=f"/media-resource/{first_id}",
-        headers={"Range": "bytes=999999999-1000000000"},
-        allow_error=True,
-    )
-    assert_true(_status_code(r_416) in (206, 416), "超大 Range 应返回 416 或 206")
+    assert_true(r_416.status_code in (206, 416), "超大 Range 应返回 416 或 206")
 
     # 9) 删除媒体
     http_call(
@@ -816,64 +768,69 @@ def run_media_flow() -> None:
     r_deleted, _ = http_call(
         title="Media After Delete",
         method="GET",
-        path=f"/media-resource/{first_id}",
+        path=media_path,
         allow_error=True,
+        max_bytes=0,
     )
-    assert_true(_status_code(r_deleted) == 404, "删除后的媒体应返回 404")
+    assert_true(r_deleted.status_code == 404, "删除后的媒体应返回 404")
 
     # 10) 批量删除
-    _, body = http_call(
+    _, page2 = http_json(
         title="Media List For Batch",
         method="GET",
         path="/media-list",
         query={"seed": session_seed, "offset": 0, "limit": 6, "order": "seeded"},
     )
-    page2 = _decode_json(body)
     ids = [item["id"] for item in page2.get("items", []) if item.get("id") != first_id]
     ids = ids[:2]
     if ids:
-        _, body = http_call(
+        _, resp_obj = http_json(
             title="Batch Delete",
             method="POST",
             path="/media/batch-delete",
             json_body={"ids": ids, "delete_file": True},
         )
-        resp_obj = _decode_json(body)
         deleted = set(resp_obj.get("deleted", []))
         failed = resp_obj.get("failed", [])
         assert_true(set(ids).issubset(deleted), f"批删返回异常: {resp_obj}")
         assert_true(len(failed) == 0, f"批删失败列表应为空: {failed}")
 
-        _, body2 = http_call(
+        _, resp2 = http_json(
             title="Batch Delete Idempotent",
             method="POST",
             path="/media/batch-delete",
             json_body={"ids": ids, "delete_file": True},
         )
-        resp2 = _decode_json(body2)
         deleted2 = set(resp2.get("deleted", []))
         assert_true(set(ids).issubset(deleted2), "幂等批删应包含相同 ID")
 
-        for mid in ids:
-            r_chk, _ = http_call(
-                title=f"Verify Deleted {mid}",
-                method="GET",
-                path=f"/media-resource/{mid}",
-                allow_error=True,
-            )
-            assert_true(_status_code(r_chk) == 404, f"被批删的 {mid} 应返回 404")
+        # 逐个确认 404 的请求互不依赖，并发发出；只看状态码，不读响应体
+        with ThreadPoolExecutor(max_workers=min(len(ids), 16)) as pool:
+            checks = {
+                mid: pool.submit(
+                    http_call,
+                    title=f"Verify Deleted {mid}",
+                    method="GET",
+                    path=f"/media-resource/{mid}",
+                    allow_error=True,
+                    max_bytes=0,
+                )
+                for mid in ids
+            }
+        for mid, fut in checks.items():
+            r_chk, _ = fut.result()
+            assert_true(r_chk.status_code == 404, f"被批删的 {mid} 应返回 404")
 
     exercise_media_source_lifecycle([lifecycle_source_id, smb_source_id])
 
-    print("\nAll API flow steps completed successfully.")
+    emit("\nAll API flow steps completed successfully.")
 
 
 def main() -> None:
-    global BASE_URL
-    BASE_URL = _select_base_url(BASE_URL)
+    set_base_url(pin_resolved_host(select_base_url(get_base_url())))
     if VERBOSE:
-        print("Client Mode = network")
-        print(f"API_BASE_URL = {BASE_URL}")
+        emit("Client Mode = network")
+        emit(f"API_BASE_URL = {get_base_url()}")
     run_media_flow()
 
 
@@ -109,6 +109,6 @@ def list_collection_items(
 ):
     try:
         medias = collection_service.list_collection_items(db, col_id, offset, limit)
-        return [media_service._to_media_item(db, m, include_thumb=True) for m in medias]
+        return media_service._to_media_items_bulk(db, medias, include_thumb=True)
     except ServiceError as exc:
         _raise_service_error(exc)
@@ -6,16 +6,23 @@ from datetime import datetime
 from typing import AsyncIterator, Optional
 
 import anyio
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 
+from app.api.sources_routes import build_scan_status_response
 from app.api.task_routes import get_asset_pipeline_status, get_scan_progress
 from app.db import SessionLocal
 from app.db.models import TagDefinition
-from app.services import media_service
+from app.db.models_extra import ScanJob
+from app.services import media_service, tag_events
+from app.services.scan_service import get_scan_status
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+# 标签流空闲时的心跳间隔（SSE 注释帧，防止代理断开长连接）
+_TAGS_KEEPALIVE_SECONDS = 15.0
+
 
 def _sse(event: str, data: object) -> str:
     payload = json.dumps(data, ensure_ascii=False)
@@ -23,33 +30,90 @@ def _sse(event: str, data: object) -> str:
 
 
 def _parse_iso_datetime(value: str) -> Optional[datetime]:
-    raw = (value or "").strip()
-    if not raw:
+    if not (value or "").strip():
         return None
-    # 兼容 2025-01-01T00:00:00Z
-    if raw.endswith("Z"):
-        raw = raw[:-1] + "+00:00"
+    # 兼容 2025-01-01T00:00:00Z；解析结果在 media_service 中按字符串缓存
     try:
-        return datetime.fromisoformat(raw)
+        return media_service.parse_tag_cursor(value)
     except Exception:
         return None
 
 
+class _TaskSnapshotHub:
+    """同一 interval 的 /events/tasks 连接共用一个后台轮询：快照每个周期只算一次，去重后广播给所有订阅者。"""
+
+    def __init__(self, interval_ms: int) -> None:
+        self.interval_ms = interval_ms
+        self.interval = interval_ms / 1000.0
+        self.subscribers: set[asyncio.Queue[str | None]] = set()
+        self.last: str | None = None
+        self.task: asyncio.Task | None = None
+
+    def subscribe(self) -> asyncio.Queue[str | None]:
+        # 每个订阅者只保留最新一帧，慢客户端不会堆积过期快照
+        queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=1)
+        if self.last is not None:
+            queue.put_nowait(self.last)
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._poll())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[str | None]) -> None:
+        self.subscribers.discard(queue)
+        if not self.subscribers:
+            if self.task is not None:
+                self.task.cancel()
+                self.task = None
+            self.last = None
+            # 没有订阅者就从表里移除，避免每个出现过的 interval 都常驻一个 hub
+            if _task_hubs.get(self.interval_ms) is self:
+                del _task_hubs[self.interval_ms]
+
+    def _broadcast(self, frame: str | None) -> None:
+        for queue in list(self.subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(frame)
+
+    async def _poll(self) -> None:
+        try:
+            while True:
+                scan = await anyio.to_thread.run_sync(lambda: get_scan_progress(False).model_dump(mode="json"))
+                asset = await anyio.to_thread.run_sync(lambda: get_asset_pipeline_status().model_dump(mode="json"))
+                frame = _sse("snapshot", {"scan": scan, "asset": asset})
+                if frame != self.last:
+                    self.last = frame
+                    self._broadcast(frame)
+                await asyncio.sleep(self.interval)
+        except Exception as exc:
+            # 通知所有连接结束（与原先单连接轮询出错即断开一致），由客户端重连；下一个订阅者会重新拉起轮询
+            print(f"[events] 任务快照轮询失败: {exc}")
+            self.last = None
+            self._broadcast(None)
+
+
+_task_hubs: dict[int, _TaskSnapshotHub] = {}
+
+
 @router.get("/tasks")
 async def stream_tasks(interval_ms: int = Query(1000, ge=200, le=10_000)) -> StreamingResponse:
     """任务进度 SSE：1s 内刷新。"""
 
     async def gen() -> AsyncIterator[str]:
-        last: str | None = None
-        while True:
-            scan = await anyio.to_thread.run_sync(lambda: get_scan_progress(False).model_dump(mode="json"))
-            asset = await anyio.to_thread.run_sync(lambda: get_asset_pipeline_status().model_dump(mode="json"))
-            data = {"scan": scan, "asset": asset}
-            frame = _sse("snapshot", data)
-            if frame != last:
+        # 取 hub 与订阅在同一个事件循环步骤内完成，中间不会被其他连接的退订移出表
+        hub = _task_hubs.get(interval_ms)
+        if hub is None:
+            hub = _task_hubs[interval_ms] = _TaskSnapshotHub(interval_ms)
+        queue = hub.subscribe()
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    raise RuntimeError("task snapshot poller failed")
                 yield frame
-                last = frame
-            await asyncio.sleep(interval_ms / 1000.0)
+        finally:
+            hub.unsubscribe(queue)
 
     return StreamingResponse(
         gen(),
@@ -63,49 +127,133 @@ async def stream_tasks(interval_ms: int = Query(1000, ge=200, le=10_000)) -> Str
     )
 
 
+def _reload_scan_job(db: Session, job_id: str) -> Optional[ScanJob]:
+    """重新读取任务状态；读完即 expunge 并结束只读事务，避免 SQLite 共享锁阻塞扫描线程写入。"""
+    try:
+        job = db.get(ScanJob, job_id, populate_existing=True)
+        if job is not None:
+            db.expunge(job)
+        return job
+    finally:
+        db.rollback()
+
+
+@router.get("/scan")
+async def stream_scan(
+    job_id: str = Query(..., description="任务ID"),
+    interval_ms: int = Query(100, ge=20, le=5_000),
+) -> StreamingResponse:
+    """扫描任务 SSE：状态变化即推送，任务结束（completed/failed）后关闭连接。"""
+
+    job = await anyio.to_thread.run_sync(get_scan_status, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+
+    async def gen() -> AsyncIterator[str]:
+        current = job
+        last: str | None = None
+        # 整个连接复用一个 Session，不再每个 tick 新建/销毁
+        db = SessionLocal()
+        try:
+            while True:
+                data = build_scan_status_response(current).model_dump(mode="json")
+                frame = _sse("status", data)
+                if frame != last:
+                    yield frame
+                    last = frame
+                if data["state"] != "running":
+                    return
+                await asyncio.sleep(interval_ms / 1000.0)
+                current = await anyio.to_thread.run_sync(_reload_scan_job, db, job_id) or current
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        gen(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @router.get("/tags")
 async def stream_tags(
-    interval_ms: int = Query(300, ge=100, le=10_000),
+    interval_ms: int = Query(300, ge=100, le=10_000, description="两次增量查询的最小间隔（合并短时间内的连续新增）"),
     since: str | None = Query(None, description="ISO8601 时间戳；不传则先发全量快照"),
 ) -> StreamingResponse:
-    """标签变更 SSE：新增标签尽量立刻推送给前端做联想缓存。"""
+    """标签变更 SSE：新增标签提交后由 tag_events 唤醒再查增量，空闲时不查库。"""
 
     async def gen() -> AsyncIterator[str]:
-        cursor = _parse_iso_datetime(since) if since else None
+        # 先订阅再取快照：快照与订阅之间提交的标签也会触发一次增量查询
+        signal = tag_events.subscribe()
+        # 整个连接复用一个 Session；每次查询后立即结束只读事务，不在等待/推送期间占着 SQLite 共享锁
+        db = SessionLocal()
+        try:
+            cursor = _parse_iso_datetime(since) if since else None
+            last_name: str | None = None
 
-        # 首帧：全量快照（与 /tags?with_translation=true 口径一致）
-        if cursor is None:
-            with SessionLocal() as db:
+            # 首帧：全量快照（与 /tags?with_translation=true 口径一致）
+            if cursor is None:
                 tags = media_service.list_tags_with_translation(db)
                 max_created = db.query(TagDefinition.created_at).order_by(TagDefinition.created_at.desc()).first()
                 cursor = max_created[0] if max_created else None
-            yield _sse("snapshot", {"tags": tags})
+                db.rollback()
+                yield _sse("snapshot", {"tags": tags})
+            else:
+                # 带游标重连：先补发断开期间新增的标签
+                signal.set()
 
-        while True:
-            with SessionLocal() as db:
-                q = db.query(TagDefinition).order_by(TagDefinition.created_at.asc(), TagDefinition.name.asc())
+            while True:
+                try:
+                    await asyncio.wait_for(signal.wait(), timeout=_TAGS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                signal.clear()
+                q = db.query(TagDefinition.name, TagDefinition.created_at).order_by(
+                    TagDefinition.created_at.asc(), TagDefinition.name.asc()
+                )
                 if cursor is not None:
-                    q = q.filter(TagDefinition.created_at.isnot(None) & (TagDefinition.created_at > cursor))
+                    # keyset：(created_at, name) 严格大于上一批最后一条，同一时间戳的标签跨批也不会漏
+                    after = TagDefinition.created_at > cursor
+                    if last_name is not None:
+                        after = after | ((TagDefinition.created_at == cursor) & (TagDefinition.name > last_name))
+                    q = q.filter(TagDefinition.created_at.isnot(None) & after)
                 rows = q.limit(200).all()
+                db.rollback()
                 if rows:
                     translations = media_service._load_tag_translations()  # noqa: SLF001
-                    for row in rows:
-                        name = str(row.name)
+                    frames: list[str] = []
+                    for name, created_at in rows:
+                        name = str(name)
                         display = translations.get(name) or translations.get(media_service._normalize_tag_key(name))  # noqa: SLF001
-                        yield _sse(
-                            "tag_added",
-                            {
-                                "name": name,
-                                "display_name": display,
-                                "created_at": row.created_at.isoformat() if row.created_at else None,
-                            },
+                        frames.append(
+                            _sse(
+                                "tag_added",
+                                {
+                                    "name": name,
+                                    "display_name": display,
+                                    "created_at": created_at.isoformat() if created_at else None,
+                                },
+                            )
                         )
-                    # 更新 cursor
-                    last_created = rows[-1].created_at
+                    # 一批增量合并成一次写出：帧格式不变（客户端仍逐条收到 tag_added），突发新增时不再一行一次 send
+                    yield "".join(frames)
+                    # 更新 keyset 游标
+                    last_created = rows[-1][1]
                     if last_created:
-                        cursor = last_created
+                        cursor, last_name = last_created, str(rows[-1][0])
+                    if len(rows) == 200:
+                        # 本批未取完，下一轮继续
+                        signal.set()
 
-            await asyncio.sleep(interval_ms / 1000.0)
+                await asyncio.sleep(interval_ms / 1000.0)
+        finally:
+            db.close()
+            tag_events.unsubscribe(signal)
 
     return StreamingResponse(
         gen(),
@@ -10,10 +10,10 @@ from app.schemas.face import (
     FaceClusterListResponse,
     FaceClusterModel,
     RebuildFacesRequest,
-    RebuildFacesResponse,
+    RebuildFacesAcceptedResponse,
 )
 from app.services import face_cluster_service
-from app.services.face_cluster_progress import get_face_progress
+from app.services.face_warmup import submit_rebuild_face_clusters
 from app.services.exceptions import ServiceError
 
 router = APIRouter(prefix="/face-clusters", tags=["faces"])
@@ -32,25 +32,27 @@ def _raise_service_error(exc: ServiceError):
     raise HTTPException(status_code=exc.status_code, detail=detail)
 
 
-@router.post("/rebuild", response_model=RebuildFacesResponse)
-def rebuild_face_clusters(req: RebuildFacesRequest, db: Session = Depends(get_db)):
+@router.post("/rebuild", status_code=202, response_model=RebuildFacesAcceptedResponse)
+def rebuild_face_clusters(req: RebuildFacesRequest):
+    """校验目录后把重建交给后台线程，立即返回 202；进度见 /tasks/face-progress。"""
     try:
-        media_count, face_count, cluster_count, path, version = face_cluster_service.rebuild_clusters(
-            db,
-            base_path=req.base_path,
-            similarity_threshold=req.similarity_threshold,
-            progress=get_face_progress(),
-        )
+        path = face_cluster_service._resolve_base_path(req.base_path)  # noqa: SLF001
     except ServiceError as exc:
         _raise_service_error(exc)
 
-    return RebuildFacesResponse(
-        mediaCount=media_count,
-        faceCount=face_count,
-        clusterCount=cluster_count,
-        threshold=req.similarity_threshold,
-        basePath=str(path),
-        pipelineVersion=version,
+    if not submit_rebuild_face_clusters(str(path), req.similarity_threshold):
+        raise HTTPException(status_code=409, detail="face clustering is already running")
+    return RebuildFacesAcceptedResponse(basePath=str(path), threshold=req.similarity_threshold)
+
+
+def _cluster_model(cluster) -> FaceClusterModel:
+    # 字段均来自数据库列（label/face_count 非空、id 为整数），类型已确定：跳过逐条校验
+    return FaceClusterModel.model_construct(
+        id=cluster.id,
+        label=cluster.label,
+        faceCount=int(getattr(cluster, "_active_face_count", cluster.face_count) or 0),
+        representativeMediaId=getattr(cluster, "_active_rep_media_id", cluster.representative_media_id),
+        representativeFaceId=getattr(cluster, "_active_rep_face_id", cluster.representative_face_id),
     )
 
 
@@ -65,16 +67,7 @@ def list_face_clusters(  # noqa: D417 - FastAPI query params
     except ServiceError as exc:
         _raise_service_error(exc)
 
-    payload = [
-        FaceClusterModel(
-            id=cluster.id,
-            label=cluster.label,
-            faceCount=int(getattr(cluster, "_active_face_count", cluster.face_count) or 0),
-            representativeMediaId=getattr(cluster, "_active_rep_media_id", cluster.representative_media_id),
-            representativeFaceId=getattr(cluster, "_active_rep_face_id", cluster.representative_face_id),
-        )
-        for cluster in clusters
-    ]
+    payload = [_cluster_model(cluster) for cluster in clusters]
 
     has_more = offset + len(payload) < total
     return {
@@ -94,32 +87,21 @@ def get_cluster_media(
     db: Session = Depends(get_db),
 ):
     try:
-        cluster, faces, total = face_cluster_service.list_cluster_media(db, cluster_id, offset=offset, limit=limit)
+        cluster, media_rows, total = face_cluster_service.list_cluster_media(db, cluster_id, offset=offset, limit=limit)
     except ServiceError as exc:
         _raise_service_error(exc)
 
-    seen_media: set[int] = set()
-    items: list[ClusterMediaItem] = []
-    for face in faces:
-        if face.media_id in seen_media:
-            continue
-        seen_media.add(face.media_id)
-        media = face.media
-        items.append(
-            ClusterMediaItem(
-                mediaId=face.media_id,
-                filename=media.filename if media else "unknown",
-                thumbnailUrl=f"/media/{face.media_id}/thumbnail",
-            )
+    # media_rows 已在服务层按 media 去重分页：(media_id, filename)
+    items = [
+        ClusterMediaItem.model_construct(
+            mediaId=media_id,
+            filename=filename or "unknown",
+            thumbnailUrl=f"/media/{media_id}/thumbnail",
         )
+        for media_id, filename in media_rows
+    ]
 
-    cluster_payload = FaceClusterModel(
-        id=cluster.id,
-        label=cluster.label,
-        faceCount=int(getattr(cluster, "_active_face_count", cluster.face_count) or 0),
-        representativeMediaId=getattr(cluster, "_active_rep_media_id", cluster.representative_media_id),
-        representativeFaceId=getattr(cluster, "_active_rep_face_id", cluster.representative_face_id),
-    )
+    cluster_payload = _cluster_model(cluster)
 
     has_more = offset + len(items) < total
     return ClusterMediaResponse(
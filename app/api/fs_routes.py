@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse
+from typing import Iterable, Iterator
 
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.api.http_cache import file_validators, is_not_modified, not_modified_response
 from app.schemas.fs import (
     DeleteRequest,
     ListResponse,
@@ -13,7 +17,7 @@ from app.schemas.fs import (
     SortField,
     SortOrder,
 )
-from app.services import fs_service
+from app.services import fs_service, fs_thumbs
 
 router = APIRouter(prefix="/fs", tags=["fs"])
 
@@ -21,8 +25,9 @@ router = APIRouter(prefix="/fs", tags=["fs"])
 @router.get("/roots", response_model=list[RootInfo])
 def list_roots():
     entries = fs_service.discover_roots()
+    # RootEntry 由 discover_roots 构造、字段类型已确定，跳过逐条校验
     return [
-        RootInfo(
+        RootInfo.model_construct(
             id=e.id,
             display_name=e.display_name,
             abs_path=str(e.path),
@@ -47,8 +52,9 @@ def list_dir(
     sort: SortField = Query(SortField.name),
     order: SortOrder = Query(SortOrder.asc),
     media_only: bool = Query(True, description="仅返回媒体文件（图片/视频），目录始终返回"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor；传入时忽略 offset"),
 ):
-    items, total = fs_service.list_dir(
+    items, total, next_cursor = fs_service.list_dir(
         root_id,
         path,
         offset=offset,
@@ -57,8 +63,37 @@ def list_dir(
         sort=sort.value,
         order=order.value,
         media_only=media_only,
+        cursor=cursor,
     )
-    return ListResponse(items=items, total=total, offset=offset, limit=limit)
+    return ListResponse(items=items, total=total, offset=offset, limit=limit, next_cursor=next_cursor)
+
+
+# 流式列目录每攒够这么多行写出一次，避免超大目录逐条 send
+_STREAM_BATCH = 128
+
+
+def _ndjson_lines(entries: Iterable[dict]) -> Iterator[bytes]:
+    batch: list[bytes] = []
+    for entry in entries:
+        batch.append(orjson.dumps(entry))
+        if len(batch) >= _STREAM_BATCH:
+            yield b"\n".join(batch) + b"\n"
+            batch.clear()
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+@router.get("/list-stream")
+def list_dir_stream(
+    root_id: str = Query(..., description="root id"),
+    path: str = Query("", description="相对路径"),
+    show_hidden: bool = Query(False),
+    media_only: bool = Query(True, description="仅返回媒体文件（图片/视频），目录始终返回"),
+):
+    """NDJSON 逐行输出目录条目（字段同 /fs/list 的 items，目录原始顺序、不分页），读到即发。"""
+    entries = fs_service.iter_dir(root_id, path, show_hidden=show_hidden, media_only=media_only)
+    # 同步生成器由 Starlette 放到线程池迭代，scandir/stat 不阻塞事件循环
+    return StreamingResponse(_ndjson_lines(entries), media_type="application/x-ndjson")
 
 
 @router.post("/mkdir", status_code=201)
@@ -92,10 +127,19 @@ def copy(req: MoveCopyRequest):
 
 
 @router.get("/file")
-def get_file(root_id: str = Query(...), path: str = Query(...), disposition: str = Query("inline")):
+def get_file(
+    request: Request,
+    root_id: str = Query(...),
+    path: str = Query(...),
+    disposition: str = Query("inline"),
+):
     file_path = fs_service.file_path(root_id, path)
+    # 用户目录里的文件随时可能被改写：允许缓存但每次先校验，未变化时回 304 不再传输文件
+    headers = {**file_validators(file_path.stat()), "Cache-Control": "no-cache"}
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
     mime = fs_service.guess_mime(file_path)
-    response = FileResponse(path=file_path, filename=file_path.name, media_type=mime)
+    response = FileResponse(path=file_path, filename=file_path.name, media_type=mime, headers=headers)
     if disposition == "attachment":
         response.headers["Content-Disposition"] = f"attachment; filename=\"{file_path.name}\""
     return response
@@ -103,16 +147,19 @@ def get_file(root_id: str = Query(...), path: str = Query(...), disposition: str
 
 @router.get("/thumb")
 def get_thumb(
+    request: Request,
     root_id: str = Query(...),
     path: str = Query(...),
     w: int = Query(320, ge=64, le=1200),
     h: int = Query(320, ge=64, le=1200),
 ):
     file_path = fs_service.file_path(root_id, path)
+    # 校验值取自源文件 stat + 请求尺寸：命中 304 时连整文件指纹都不用算
+    headers = {**file_validators(file_path.stat(), variant=f"{w}x{h}"), "Cache-Control": "no-cache"}
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
     fingerprint = fs_service.compute_fingerprint(file_path)
     dest = fs_service.thumb_path_for_fingerprint(fingerprint)
-    if not dest.exists():
-        ok = fs_service.generate_thumbnail(file_path, dest, max_size=(w, h))
-        if not ok:
-            raise HTTPException(status_code=404, detail={"code": "thumb_failed", "message": "cannot generate thumbnail"})
-    return FileResponse(dest, media_type="image/jpeg")
+    if not fs_thumbs.ensure_thumbnail(file_path, dest, max_size=(w, h)):
+        raise HTTPException(status_code=404, detail={"code": "thumb_failed", "message": "cannot generate thumbnail"})
+    return FileResponse(dest, media_type="image/jpeg", headers=headers)
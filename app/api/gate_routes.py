@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
 from app.db import Media, SessionLocal
-from app.services.asset_pipeline import enqueue_security_gate
+from app.services.asset_pipeline import enqueue_security_gate, enqueue_security_gate_for
 
 router = APIRouter(prefix="/gate", tags=["gate"])
 
@@ -18,6 +19,10 @@ def get_db() -> Session:
         db.close()
 
 
+# 按路径查媒体的语句只构造一次；查出的 Media 直接交给安检门排队，不再按 id 重查
+_MEDIA_BY_PATH = select(Media).where(Media.absolute_path == bindparam("path")).limit(1)
+
+
 class GateByPathRequest(BaseModel):
     absolute_path: str = Field(..., description="媒体绝对路径（与 media.absolute_path 完全一致）")
 
@@ -30,9 +35,10 @@ def run_gate_for_media(media_id: int):
 
 @router.post("/by-path")
 def run_gate_by_path(req: GateByPathRequest, db: Session = Depends(get_db)):
-    media = db.query(Media).filter(Media.absolute_path == req.absolute_path).first()
-    if not media:
+    media = db.execute(_MEDIA_BY_PATH, {"path": req.absolute_path}).scalar_one_or_none()
+    if media is None:
         raise HTTPException(status_code=404, detail="media not found")
-    enqueue_security_gate(int(media.id))
-    return {"queued": True, "media_id": int(media.id)}
+    media_id = int(media.id)
+    enqueue_security_gate_for(db, media)
+    return {"queued": True, "media_id": media_id}
 
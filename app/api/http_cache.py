@@ -0,0 +1,38 @@
+"""文件类响应的 HTTP 缓存校验：ETag / Last-Modified 与条件请求（If-None-Match / If-Modified-Since → 304）。"""
+
+from __future__ import annotations
+
+import os
+from email.utils import formatdate, parsedate
+from typing import Mapping
+
+from fastapi import Request, Response
+
+# 304 响应只回带这些校验/缓存头，不含 Content-Type/Content-Length
+_NOT_MODIFIED_HEADERS = ("ETag", "Last-Modified", "Cache-Control")
+
+
+def file_validators(st: os.stat_result, *, variant: str = "") -> dict[str, str]:
+    """由文件 stat 生成 ETag / Last-Modified；variant 用于同一文件的不同渲染（如缩略图尺寸）。
+
+    ETag 用纳秒级 mtime：秒级时间戳下，同一秒内写入等长的新内容会被误判为未修改。
+    """
+    etag = f"{st.st_mtime_ns}-{st.st_size}"
+    if variant:
+        etag = f"{etag}-{variant}"
+    return {"ETag": f'"{etag}"', "Last-Modified": formatdate(st.st_mtime, usegmt=True)}
+
+
+def is_not_modified(request: Request, headers: Mapping[str, str]) -> bool:
+    """与 Starlette StaticFiles 相同的判定：有 If-None-Match 时只比 ETag，否则比较 If-Modified-Since。"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = headers.get("ETag")
+        return etag is not None and etag.strip('" W/') in [tag.strip('" W/') for tag in if_none_match.split(",")]
+    if_modified_since = parsedate(request.headers.get("if-modified-since") or "")
+    last_modified = parsedate(headers.get("Last-Modified") or "")
+    return if_modified_since is not None and last_modified is not None and if_modified_since >= last_modified
+
+
+def not_modified_response(headers: Mapping[str, str]) -> Response:
+    return Response(status_code=304, headers={k: headers[k] for k in _NOT_MODIFIED_HEADERS if k in headers})
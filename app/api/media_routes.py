@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-from datetime import datetime
-
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.api.http_cache import is_not_modified, not_modified_response
 from app.db import SessionLocal
 from app.schemas.media import (
     DeleteBatchReq,
@@ -85,11 +84,7 @@ def list_tags(
     try:
         if with_translation:
             if since:
-                # 允许 Z 后缀
-                raw = since.strip()
-                if raw.endswith("Z"):
-                    raw = raw[:-1] + "+00:00"
-                dt = datetime.fromisoformat(raw)
+                dt = media_service.parse_tag_cursor(since)
                 tags = media_service.list_tags_with_translation_since(db, since_dt=dt)
             else:
                 tags = media_service.list_tags_with_translation(db)
@@ -122,9 +117,11 @@ def batch_delete_media(req: DeleteBatchReq, db: Session = Depends(get_db)):
 
 
 @router.get("/media/{key}/thumbnail")
-def get_media_thumbnail(key: str, db: Session = Depends(get_db)):
+def get_media_thumbnail(key: str, request: Request, db: Session = Depends(get_db)):
     try:
         payload = media_service.get_thumbnail_payload(db, key=key)
+        if is_not_modified(request, payload.headers):
+            return not_modified_response(payload.headers)
         return FileResponse(path=payload.path, media_type=payload.media_type, headers=payload.headers)
     except ServiceError as exc:
         _raise_service_error(exc)
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Request, status
+from sqlalchemy import delete
 
 from app.schemas.settings import AutoScanStatusResponse, AutoScanUpdateRequest, DbResetRequest, DbResetResponse
 from app.services.auto_scan_service import (
@@ -121,33 +122,20 @@ def reset_initialization(request: Request):
         from app.db.models_extra import MediaSource, ScanJob
         from app.db import AppSetting, TagDefinition, MEDIA_ROOT_KEY, AUTO_SCAN_ENABLED_KEY
 
-        # 统计删除数量
+        # 统计删除数量：所有删除在同一事务内以 Core DELETE 执行（不加载 ORM 对象），最后一次提交
         deletion_stats = {}
-
-        # 1. 删除所有扫描任务记录
-        deleted_scan_jobs = db.query(ScanJob).delete(synchronize_session=False)
-        deletion_stats['scan_jobs'] = deleted_scan_jobs
-
-        # 2. 删除所有媒体标签记录
-        deleted_tags = db.query(MediaTag).delete(synchronize_session=False)
-        deletion_stats['media_tags'] = deleted_tags
-
-        # 3. 删除所有媒体文件记录
-        deleted_media = db.query(Media).delete(synchronize_session=False)
-        deletion_stats['media'] = deleted_media
-
-        # 4. 删除所有媒体来源记录
-        deleted_sources = db.query(MediaSource).delete(synchronize_session=False)
-        deletion_stats['media_sources'] = deleted_sources
-
-        # 5. 删除媒体相关的应用设置
-        # 删除媒体根目录设置
-        deleted_root_setting = db.query(AppSetting).filter(AppSetting.key == MEDIA_ROOT_KEY).delete(synchronize_session=False)
-        deletion_stats['media_root_setting'] = deleted_root_setting
-
-        # 删除自动扫描设置
-        deleted_auto_scan_setting = db.query(AppSetting).filter(AppSetting.key == AUTO_SCAN_ENABLED_KEY).delete(synchronize_session=False)
-        deletion_stats['auto_scan_setting'] = deleted_auto_scan_setting
+        for key, model in (
+            ('scan_jobs', ScanJob),
+            ('media_tags', MediaTag),
+            ('media', Media),
+            ('media_sources', MediaSource),
+        ):
+            deletion_stats[key] = db.execute(delete(model)).rowcount
+
+        # 媒体相关的应用设置（媒体根目录 + 自动扫描开关）合并为一条 IN 删除
+        deletion_stats['media_settings'] = db.execute(
+            delete(AppSetting).where(AppSetting.key.in_((MEDIA_ROOT_KEY, AUTO_SCAN_ENABLED_KEY)))
+        ).rowcount
 
         db.commit()
 
@@ -157,8 +145,7 @@ def reset_initialization(request: Request):
         print(f"  - 媒体标签: {deletion_stats['media_tags']} 条")
         print(f"  - 媒体来源: {deletion_stats['media_sources']} 条")
         print(f"  - 扫描任务: {deletion_stats['scan_jobs']} 条")
-        print(f"  - 媒体根目录设置: {deletion_stats['media_root_setting']} 条")
-        print(f"  - 自动扫描设置: {deletion_stats['auto_scan_setting']} 条")
+        print(f"  - 媒体根目录/自动扫描设置: {deletion_stats['media_settings']} 条")
         print(f"总计删除 {sum(deletion_stats.values())} 条记录")
 
     except Exception as e:
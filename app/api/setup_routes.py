@@ -1,4 +1,3 @@
-from pathlib import Path
 from typing import List
 
 from fastapi import APIRouter, HTTPException, Query, Request, Response, BackgroundTasks
@@ -15,9 +14,15 @@ from app.schemas.setup import (
     InitializationStatusResponse,
     MediaRootRequest,
 )
-from app.services.filesystem_browser import DirectoryInfo, list_roots, list_subdirectories
+from app.services.filesystem_browser import (
+    DirectoryInfo,
+    cached_common_folders,
+    cached_roots,
+    invalidate_listing_caches,
+    list_subdirectories,
+    resolve_user_path,
+)
 from app.services.permissions import probe_paths
-from app.services.common_folders import list_common_folders
 from app.services.network_info import list_lan_ips, detect_os_name
 from app.services.init_state import InitializationCoordinator, InitializationState
 from app.services.media_initializer import (
@@ -28,25 +33,25 @@ from app.services.media_initializer import (
 )
 from app.services.sources_service import list_sources
 from app.services.auto_scan_service import ensure_auto_scan_service
-from app.services.scan_service import scan_source_once
-from app.services.clip_warmup import warmup_missing_clip_embeddings
-from app.services.asset_warmup import warmup_assets_for_source, is_thumbnail_warmup_enabled
-from app.services.tag_warmup import warmup_rebuild_tags_for_active_media
-from app.services.face_warmup import warmup_rebuild_face_clusters
 
 router = APIRouter(tags=["setup"])
 
+# /init-status 被设置页高频轮询：“是否需要按数据库自动恢复为已完成”只判断一次，
+# 之后的轮询不再查库；设置媒体根路径后重新允许判断
+_auto_restore_decided = False
+
 
-def _ensure_coordinator(request: Request) -> InitializationCoordinator:
-    coordinator = getattr(request.app.state, "init_coordinator", None)
+def _ensure_coordinator(app) -> InitializationCoordinator:
+    coordinator = getattr(app.state, "init_coordinator", None)
     if coordinator is None:
         coordinator = InitializationCoordinator()
-        request.app.state.init_coordinator = coordinator
+        app.state.init_coordinator = coordinator
     return coordinator
 
 
 def _info_to_model(info: DirectoryInfo) -> DirectoryEntryModel:
-    return DirectoryEntryModel(
+    # DirectoryInfo 由服务端自己构造，字段类型可信，跳过逐字段校验
+    return DirectoryEntryModel.model_construct(
         path=info.path,
         name=info.name,
         readable=info.readable,
@@ -58,8 +63,7 @@ def _info_to_model(info: DirectoryInfo) -> DirectoryEntryModel:
 
 @router.get("/filesystem/roots", response_model=List[DirectoryEntryModel])
 def get_filesystem_roots():
-    infos = list_roots()
-    return [_info_to_model(info) for info in infos]
+    return [_info_to_model(info) for info in cached_roots()]
 
 
 @router.get("/filesystem/list", response_model=DirectoryListResponse)
@@ -73,7 +77,8 @@ def get_directory_listing(path: str = Query(..., description="要查看的目录
     except PermissionError as exc:
         raise HTTPException(status_code=403, detail=str(exc))
 
-    resolved = Path(path).expanduser().resolve()
+    # list_subdirectories 刚解析过同一路径，这里命中缓存
+    resolved = resolve_user_path(path)
     parent = resolved.parent if resolved != resolved.parent else None
     return DirectoryListResponse(
         current_path=str(resolved),
@@ -84,130 +89,153 @@ def get_directory_listing(path: str = Query(..., description="要查看的目录
 
 @router.get("/filesystem/common-folders", response_model=list[CommonFolderEntryModel])
 def get_common_folders():
-    infos = list_common_folders()
-    results: list[CommonFolderEntryModel] = []
-    for info in infos:
-        results.append(
-            CommonFolderEntryModel(
-                path=info.path,
-                name=info.name,
-                readable=info.readable,
-                writable=info.writable,
-                is_root=info.is_root,
-                is_symlink=info.is_symlink,
-                category=CommonFolderCategory(info.category),
-            )
+    return [
+        CommonFolderEntryModel.model_construct(
+            path=info.path,
+            name=info.name,
+            readable=info.readable,
+            writable=info.writable,
+            is_root=info.is_root,
+            is_symlink=info.is_symlink,
+            category=CommonFolderCategory(info.category),
         )
-    return results
+        for info in cached_common_folders()
+    ]
 
 
-@router.post("/media-root", status_code=200)
-def set_media_root(
-    request: Request,
-    payload: MediaRootRequest,
-    background: BackgroundTasks = None,
-):
-    # 若未提供 path，则从 DB 中自动选择一个来源
-    if not payload.path:
-        try:
-            from app.db import SessionLocal as _SL
-            db = _SL()
-            try:
-                sources = list_sources(db, include_inactive=False)
-            finally:
-                db.close()
-        except Exception as exc:
-            raise HTTPException(status_code=500, detail=f"读取媒体来源失败：{exc}")
-        if not sources:
-            # 不再返回 404，统一 200 并给出指示
-            return {"success": False, "code": "no_media_source", "message": "没有媒体路径，请先添加"}
-        # 使用第一个活跃来源
-        candidate = sources[0].root_path
-        try:
-            validated_path = validate_media_root(candidate)
-        except MediaInitializationError as exc:
-            raise HTTPException(status_code=422, detail=str(exc))
-    else:
-        try:
-            validated_path = validate_media_root(payload.path)
-        except MediaInitializationError as exc:
-            raise HTTPException(status_code=422, detail=str(exc))
+def _persist_media_root_setting(db, path_str: str) -> tuple[int, str]:
+    """写入媒体根路径并确保对应来源存在，返回 (来源 ID, 来源根路径)。"""
+    from app.db import set_setting, resolve_media_source, MEDIA_ROOT_KEY
+
+    set_setting(db, MEDIA_ROOT_KEY, path_str)
+    # 来源行在返回前就建好：首批导入在后台执行，客户端紧接着添加/查询来源时不会与其竞争插入
+    source = resolve_media_source(db, path_str, source_id=None, type_="local")
+    db.commit()
+    return source.id, source.root_path
 
-    # 设置媒体根路径
-    from app.db import SessionLocal, set_setting, MEDIA_ROOT_KEY
-    db = SessionLocal()
-    try:
-        set_setting(db, MEDIA_ROOT_KEY, str(validated_path))
-        db.commit()
-    finally:
-        db.close()
 
-    # 先同步导入一小批媒体，确保前端立即可见（不阻塞后续的全库后台处理）
+def _initial_scan_and_warmup(path_str: str, source_id: int, source_root: str, app) -> None:
+    """响应返回后执行：首批导入、注册自动扫描，再依次跑全量导入与各类暖机。"""
+    global _auto_restore_decided
+    # 暖机模块会连带加载 torch/onnxruntime 等重依赖，只在真正设置媒体根路径时才导入
+    from app.db import SessionLocal, seed_initial_data, create_database_and_tables
+    from app.services.asset_warmup import is_thumbnail_warmup_enabled, warmup_assets_for_source
+    from app.services.clip_warmup import warmup_missing_clip_embeddings
+    from app.services.face_warmup import warmup_rebuild_face_clusters
+    from app.services.scan_service import run_scan_job, scan_source_once
+    from app.services.tag_warmup import warmup_rebuild_tags_for_active_media
+
+    # 先导入一小批媒体，确保前端尽快可见（不阻塞后续的全库后台处理）；
+    # 种子数据与首批导入共用一个会话，只提交一次；来源 ID 由请求阶段传入，无需再查
     initial_batch = 0
     try:
-        from app.db import seed_initial_data, create_database_and_tables
-
         create_database_and_tables(echo=False)
-        task_db = SessionLocal()
+        db = SessionLocal()
         try:
-            seed_initial_data(task_db)
-            initial_batch = scan_source_once(task_db, str(validated_path), limit=50)
-            task_db.commit()
+            seed_initial_data(db)
+            initial_batch = scan_source_once(db, path_str, source_id=source_id, limit=50)
+            db.commit()
             if initial_batch:
                 print(f"[media-root] 首批导入 {initial_batch} 个媒体文件。")
         except Exception as exc:
-            task_db.rollback()
+            db.rollback()
             print(f"[media-root] 首批导入失败：{exc}")
         finally:
-            task_db.close()
+            db.close()
     except Exception as exc:
         print(f"[media-root] 初始化首批导入失败：{exc}")
 
-    # 注册后台持续导入/监控服务（自动发现新增/变更的媒体文件）
-    service = ensure_auto_scan_service(request.app)
-    service.register_path(str(validated_path))
-    service.trigger_path(str(validated_path))
-
-    # 立即启动后台导入/索引任务 + 资产流水线预热 + 向量/标签/人脸 暖机任务
+    # 注册后台持续导入/监控服务（自动发现新增/变更的媒体文件）；
+    # 已在响应之后，失败时把状态置为 failed，轮询 /init-status 的客户端才不会一直等待
     try:
-        if background is not None:
-            # 查找/创建该 root 的来源ID
-            from app.db import SessionLocal as _SL
-            from app.db.models_extra import MediaSource as _MediaSource
-            _db = _SL()
-            try:
-                src = _db.query(_MediaSource).filter(_MediaSource.root_path == str(validated_path)).first()
-                if src:
-                    from app.services.scan_service import start_scan_job
-                    start_scan_job(src.id, src.root_path, background)
-                    # 媒体根路径设置成功后，可选地为该来源预热缩略图/元数据等资产任务，
-                    # 以便在“设置 > 资产处理进度”中能立即看到非 0 的统计。
-                    if is_thumbnail_warmup_enabled():
-                        background.add_task(warmup_assets_for_source, src.id)
-                # 同时启动一次 CLIP/SigLIP 向量的增量构建任务，仅为当前活动媒体路径下
-                # 缺少向量的媒体补齐 embedding。
-                background.add_task(warmup_missing_clip_embeddings)
-                # 标签暖机：对当前“活动媒体”做一轮标签重建，便于后续按标签检索。
-                background.add_task(warmup_rebuild_tags_for_active_media)
-                # 人脸暖机：基于当前媒体根目录跑一轮人脸聚类，写入 face_embeddings / face_clusters。
-                background.add_task(warmup_rebuild_face_clusters, str(validated_path))
-            finally:
-                _db.close()
-    except Exception:
-        pass
+        service = ensure_auto_scan_service(app)
+        service.register_path(path_str)
+        service.trigger_path(path_str)
+    except Exception as exc:
+        print(f"[media-root] 注册自动扫描失败：{exc}")
+        _ensure_coordinator(app).reset(
+            state=InitializationState.FAILED,
+            media_root_path=path_str,
+            message=str(exc),
+        )
+        return
 
-    # 更新初始化协调器状态为已完成
-    coordinator = _ensure_coordinator(request)
-    from app.services.init_state import InitializationState
-    coordinator.reset(
+    # 首批导入完成即视为初始化完成，后续全量导入/暖机不影响前端进入主界面
+    _ensure_coordinator(app).reset(
         state=InitializationState.COMPLETED,
-        media_root_path=str(validated_path),
+        media_root_path=path_str,
         message=(
             f"媒体库初始化完成，首批导入 {initial_batch} 个文件，后台持续导入/处理中。"
             if initial_batch
             else "媒体库初始化完成，后台持续导入/处理中。"
         ),
     )
+    _auto_restore_decided = False
+
+    # 全量导入 + 资产流水线预热 + 向量/标签/人脸 暖机，按原先加入 BackgroundTasks 的顺序依次执行
+    try:
+        run_scan_job(source_id, source_root)
+        # 媒体根路径设置成功后，可选地为该来源预热缩略图/元数据等资产任务，
+        # 以便在“设置 > 资产处理进度”中能立即看到非 0 的统计。
+        if is_thumbnail_warmup_enabled():
+            warmup_assets_for_source(source_id)
+        # CLIP/SigLIP 向量增量构建，仅为当前活动媒体路径下缺少向量的媒体补齐 embedding。
+        warmup_missing_clip_embeddings()
+        # 标签暖机：对当前“活动媒体”做一轮标签重建，便于后续按标签检索。
+        warmup_rebuild_tags_for_active_media()
+        # 人脸暖机：基于当前媒体根目录跑一轮人脸聚类，写入 face_embeddings / face_clusters。
+        warmup_rebuild_face_clusters(path_str)
+    except Exception as exc:
+        print(f"[media-root] 后台导入/暖机失败：{exc}")
+
+
+@router.post("/media-root", status_code=202)
+def set_media_root(
+    request: Request,
+    payload: MediaRootRequest,
+    background: BackgroundTasks,
+    response: Response,
+):
+    from app.db import SessionLocal
+
+    # 读取来源与写入设置共用一个会话
+    db = SessionLocal()
+    try:
+        # 若未提供 path，则从 DB 中自动选择一个来源
+        if not payload.path:
+            try:
+                sources = list_sources(db, include_inactive=False)
+            except Exception as exc:
+                raise HTTPException(status_code=500, detail=f"读取媒体来源失败：{exc}")
+            if not sources:
+                # 不再返回 404，统一 200 并给出指示
+                response.status_code = 200
+                return {"success": False, "code": "no_media_source", "message": "没有媒体路径，请先添加"}
+            # 使用第一个活跃来源
+            candidate = sources[0].root_path
+        else:
+            candidate = payload.path
+        try:
+            validated_path = validate_media_root(candidate)
+        except MediaInitializationError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+
+        # 目录结构可能刚被调整（新建/改链接），丢弃路径解析与目录列表缓存
+        resolve_user_path.cache_clear()
+        invalidate_listing_caches()
+
+        path_str = str(validated_path)
+        source_id, source_root = _persist_media_root_setting(db, path_str)
+    finally:
+        db.close()
+
+    # 建表、首批导入与暖机都放到响应之后执行；前端通过 /init-status 轮询到 completed
+    _ensure_coordinator(request.app).reset(
+        state=InitializationState.RUNNING,
+        media_root_path=path_str,
+        message="媒体库初始化中，正在导入首批媒体。",
+    )
+    background.add_task(_initial_scan_and_warmup, path_str, source_id, source_root, request.app)
 
     return {"success": True, "message": "媒体根路径设置成功"}
 
@@ -234,15 +262,18 @@ def post_permissions_probe(payload: ProbeRequest):
 
 @router.get("/init-status", response_model=InitializationStatusResponse)
 def get_initialization_status(request: Request, skip_auto_restore: bool = Query(False, description="跳过自动恢复状态")):
-    coordinator = _ensure_coordinator(request)
+    global _auto_restore_decided
+    coordinator = _ensure_coordinator(request.app)
     status = coordinator.snapshot()
 
     # 若初次访问时仍为默认状态，则根据数据库信息推断一次
     # 但只有在明确没有被手动重置的情况下才自动恢复
     if (not skip_auto_restore and
+        not _auto_restore_decided and
         status.state == InitializationState.IDLE and
         status.media_root_path is None and
         status.message != "初始化状态已重置，请重新设置媒体库路径。"):
+        _auto_restore_decided = True
         media_root = get_configured_media_root()
         if media_root and has_indexed_media():
             coordinator.reset(
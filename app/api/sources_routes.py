@@ -38,6 +38,7 @@ from app.services.sources_service import (
 )
 from app.services.fs_providers import get_provider_by_name, list_provider_capabilities
 from app.services.auto_scan_service import ensure_auto_scan_service
+from app.services.filesystem_browser import invalidate_listing_caches
 from app.services.asset_warmup import warmup_assets_for_source, is_thumbnail_warmup_enabled
 from app.services.clip_warmup import warmup_missing_clip_embeddings
 from app.services.face_warmup import warmup_rebuild_face_clusters
@@ -323,6 +324,8 @@ def create_media_source(
     scan_now = True if payload.scan is None else bool(payload.scan)
     if payload.scanIntervalSeconds is not None and payload.scanIntervalSeconds <= 0:
         raise HTTPException(status_code=422, detail="scanIntervalSeconds 必须为正整数")
+    # 用户可能刚新建/挂载了目录，丢弃设置向导的根目录/常用目录缓存
+    invalidate_listing_caches()
     if payload.type == SourceType.LOCAL:
         if not payload.rootPath:
             raise HTTPException(status_code=422, detail="rootPath required")
@@ -525,6 +528,7 @@ def remove_media_source(
     ok = delete_source(db, source_id, hard=hard)
     if not ok:
         raise HTTPException(status_code=404, detail="not found")
+    invalidate_listing_caches()
     # 删除后刷新自动扫描服务，立刻停掉对应 worker
     try:
         service = ensure_auto_scan_service(request.app)
@@ -797,11 +801,7 @@ def start_scan(
     return {"jobId": job_id}
 
 
-@router.get("/scan/status", response_model=ScanStatusResponse)
-def get_scan(job_id: str = Query(..., description="任务ID")):
-    job = get_scan_status(job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="job not found")
+def build_scan_status_response(job) -> ScanStatusResponse:
     state = ScanState(job.state)
     return ScanStatusResponse(
         jobId=job.job_id,
@@ -812,3 +812,24 @@ def get_scan(job_id: str = Query(..., description="任务ID")):
         startedAt=_iso(job.started_at),
         finishedAt=_iso(job.finished_at),
     )
+
+
+def _scan_status_etag(job) -> str:
+    return f'"{job.state}:{job.scanned_count or 0}"'
+
+
+@router.get("/scan/status", response_model=ScanStatusResponse)
+def get_scan(
+    request: Request,
+    response: Response,
+    job_id: str = Query(..., description="任务ID"),
+):
+    job = get_scan_status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    # 轮询方带上 If-None-Match 且状态未变时直接 304，省去响应体序列化与传输
+    etag = _scan_status_etag(job)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return build_scan_status_response(job)
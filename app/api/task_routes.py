@@ -43,8 +43,11 @@ def get_scan_progress(force_refresh: bool = Query(False, description="是否强
 
 
 @router.get("/face-progress", response_model=FaceProgressResponse)
-def get_face_progress_status() -> FaceProgressResponse:
-    """人脸处理/聚类的进度快照（内存态），不影响现有一次性落库流程。"""
+async def get_face_progress_status() -> FaceProgressResponse:
+    """人脸处理/聚类的进度快照（内存态），不影响现有一次性落库流程。
+
+    只读内存快照、不做 I/O，定义为 async 直接在事件循环内执行，轮询时不占线程池。
+    """
     snapshot = get_face_progress().snapshot()
     # state 映射为 schema 枚举
     state_map = {
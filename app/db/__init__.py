@@ -6,6 +6,7 @@ from .constants import (
     SCAN_INTERVAL_KEY,
     SCAN_MODE_KEY,
     SUPPORTED_IMAGE_EXTS,
+    SUPPORTED_MEDIA_EXTS,
     SUPPORTED_VIDEO_EXTS,
 )
 from .models import AppSetting, FaceCluster, FaceEmbedding, Media, MediaTag, TagDefinition
@@ -39,6 +40,7 @@ __all__ = [
     "SCAN_INTERVAL_KEY",
     "SCAN_MODE_KEY",
     "SUPPORTED_IMAGE_EXTS",
+    "SUPPORTED_MEDIA_EXTS",
     "SUPPORTED_VIDEO_EXTS",
     "clear_media_library",
     "create_database_and_tables",
@@ -1,18 +1,38 @@
 """Database base configuration and SQLAlchemy session factory."""
 from __future__ import annotations
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import QueuePool
 
 DATABASE_URL = "sqlite:///./media_app.db"
 
+# 复用 SQLite 连接：每个请求的 SessionLocal() 不再重新打开数据库文件。
+# max_overflow=-1：池满时照常新建连接（归还时关闭），并发高峰不会像定长池那样排队等待；
+# 进程内 SQLite 无需 pre_ping。重置数据库文件前由 db_reset_service 调用 engine.dispose() 清空连接池。
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=NullPool,
+    poolclass=QueuePool,
+    pool_size=16,
+    max_overflow=-1,
+    pool_pre_ping=False,
 )
 
+
+@event.listens_for(engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, _connection_record) -> None:
+    # WAL：读不阻塞写、写不阻塞读（扫描/打标签写入期间列表接口照常可读）；WAL 下 synchronous=NORMAL 不会损坏数据库，
+    # 只是掉电时可能丢最后几个事务。journal_mode 持久化在库文件里，其余 PRAGMA 按连接生效（连接池复用，只设一次）
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -6,7 +6,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from sqlalchemy import inspect, text
+from sqlalchemy import bindparam, inspect, select, text
 
 from .base import Base, SessionLocal, engine
 from .constants import (
@@ -45,9 +45,12 @@ def seed_initial_data(db_session) -> None:
     """填充预定义标签/系统设置。"""
     print("正在填充初始数据...")
     predefined_tags = ["like", "favorite", "video"]
+    existing_tags = {
+        name
+        for (name,) in db_session.query(TagDefinition.name).filter(TagDefinition.name.in_(predefined_tags)).all()
+    }
     for tag_name in predefined_tags:
-        existing_tag = db_session.query(TagDefinition).filter(TagDefinition.name == tag_name).first()
-        if not existing_tag:
+        if tag_name not in existing_tags:
             db_session.add(TagDefinition(name=tag_name))
             print(f"  - 添加标签类型: '{tag_name}'")
 
@@ -100,9 +103,12 @@ def clear_media_library(db_session) -> None:
     print(f"✅ 已清空媒体数据：删除媒体 {deleted_media} 条、关联标签 {deleted_tags} 条。")
 
 
+# 设置读取是高频路径（扫描/初始化状态/自动扫描都会读）：语句在模块级构造一次，只查 value 列
+_SETTING_VALUE_BY_KEY = select(AppSetting.value).where(AppSetting.key == bindparam("key")).limit(1)
+
+
 def get_setting(db_session, key: str) -> Optional[str]:
-    setting = db_session.query(AppSetting).filter(AppSetting.key == key).first()
-    return setting.value if setting else None
+    return db_session.execute(_SETTING_VALUE_BY_KEY, {"key": key}).scalar_one_or_none()
 
 
 def set_setting(db_session, key: str, value: str) -> None:
@@ -224,6 +230,13 @@ def _ensure_schema_upgrades() -> None:
             _alter("UPDATE tag_definitions SET created_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
         except Exception:
             pass
+        try:
+            _alter(
+                "CREATE INDEX IF NOT EXISTS ix_tag_definitions_created_at_name "
+                "ON tag_definitions (created_at, name)"
+            )
+        except Exception:
+            pass
 
     _backfill_media_sources()
     repair_media_sources_metadata()
@@ -2,6 +2,8 @@
 
 SUPPORTED_IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
 SUPPORTED_VIDEO_EXTS = {".mp4", ".mov", ".avi", ".mkv", ".wmv", ".flv"}
+# 只读判断用的合并后缀集合（来源验证等按后缀统计媒体文件的场景）
+SUPPORTED_MEDIA_EXTS = frozenset(SUPPORTED_IMAGE_EXTS | SUPPORTED_VIDEO_EXTS)
 
 MEDIA_ROOT_KEY = "media_root_path"
 AUTO_SCAN_ENABLED_KEY = "auto_scan_enabled"
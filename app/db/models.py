@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, LargeBinary, String, UniqueConstraint
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -29,6 +29,9 @@ class TagDefinition(Base):
     name = Column(String, primary_key=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=True)
 
+    # 增量标签（/tags?since=、/events/tags）按 (created_at, name) 排序并做 keyset 翻页，复合索引可直接范围扫描
+    __table_args__ = (Index("ix_tag_definitions_created_at_name", "created_at", "name"),)
+
 
 class MediaTag(Base):
     __tablename__ = "media_tags"
@@ -26,13 +26,11 @@ class FaceClusterListResponse(BaseModel):
     hasMore: bool
 
 
-class RebuildFacesResponse(BaseModel):
-    mediaCount: int
-    faceCount: int
-    clusterCount: int
-    threshold: float
+class RebuildFacesAcceptedResponse(BaseModel):
+    accepted: bool = True
     basePath: str
-    pipelineVersion: str
+    threshold: float
+    progressUrl: str = Field("/tasks/face-progress", description="轮询该接口查看进度；完成后 message 含统计结果")
 
 
 class ClusterMediaItem(BaseModel):
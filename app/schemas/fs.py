@@ -45,6 +45,7 @@ class ListResponse(BaseModel):
     total: int
     offset: int
     limit: int
+    next_cursor: Optional[str] = Field(None, description="下一页游标（本页最后一项的 name）；没有更多时为 null")
 
 
 class MkdirRequest(BaseModel):
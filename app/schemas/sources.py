@@ -63,6 +63,8 @@ class SourceValidateResponse(BaseModel):
     readable: bool
     absPath: str
     estimatedCount: int
+    # False 表示遍历在条目数/耗时上限处提前结束，estimatedCount 只是下限
+    exact: bool = True
     samples: List[str] = []
     note: str | None = None
 
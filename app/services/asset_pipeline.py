@@ -481,18 +481,29 @@ def request_tags_artifact(media: Media, session: Session, *, wait_timeout: Optio
     return pipeline.ensure_artifact(media=media, artifact_type=ArtifactType.TAGS, session=session, wait_timeout=wait_timeout)
 
 
+_SECURITY_GATE_ARTIFACTS = (
+    ArtifactType.THUMBNAIL,
+    ArtifactType.METADATA,
+    ArtifactType.VECTOR,
+    ArtifactType.TAGS,
+)
+
+
 def enqueue_security_gate(media_id: int) -> None:
     """将某个媒体加入“安检门”处理队列（缩略图/元数据/向量/标签）。"""
-    pipeline = ensure_pipeline_started()
     with SessionLocal() as session:
-        media = session.query(Media).filter(Media.id == int(media_id)).first()
+        media = session.get(Media, int(media_id))
         if not media:
             return
-        # 只排队，不等待；依赖 worker 异步执行。
-        pipeline.ensure_artifact(media=media, artifact_type=ArtifactType.THUMBNAIL, session=session, wait_timeout=0)
-        pipeline.ensure_artifact(media=media, artifact_type=ArtifactType.METADATA, session=session, wait_timeout=0)
-        pipeline.ensure_artifact(media=media, artifact_type=ArtifactType.VECTOR, session=session, wait_timeout=0)
-        pipeline.ensure_artifact(media=media, artifact_type=ArtifactType.TAGS, session=session, wait_timeout=0)
+        enqueue_security_gate_for(session, media)
+
+
+def enqueue_security_gate_for(session: Session, media: Media) -> None:
+    """同 enqueue_security_gate，但直接使用调用方已查出的 media 与 session，不再按 id 重查一次。"""
+    pipeline = ensure_pipeline_started()
+    # 只排队，不等待；依赖 worker 异步执行。
+    for artifact_type in _SECURITY_GATE_ARTIFACTS:
+        pipeline.ensure_artifact(media=media, artifact_type=artifact_type, session=session, wait_timeout=0)
 
 
 def get_cached_artifact(session: Session, media_id: int, artifact_type: ArtifactType) -> Optional[AssetArtifactResult]:
@@ -78,6 +78,14 @@ class FaceProgress:
             self._message = None
             self._base_paths = list(base_paths)
 
+    def set_total_files(self, total_files: int, base_paths: list[str]) -> None:
+        """已处于 RUNNING 时补写统计出的总文件数与路径，不重置开始时间。"""
+        now = datetime.utcnow()
+        with self._lock:
+            self._total_files = max(int(total_files or 0), 0)
+            self._base_paths = list(base_paths)
+            self._updated_at = now
+
     def tick(self, step: int = 1) -> None:
         now = datetime.utcnow()
         with self._lock:
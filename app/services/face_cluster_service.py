@@ -463,7 +463,10 @@ def get_cluster_or_404(db: Session, cluster_id: int) -> FaceCluster:
     return cluster
 
 
-def list_cluster_media(db: Session, cluster_id: int, offset: int = 0, limit: int = 100) -> tuple[FaceCluster, List[FaceEmbedding], int]:
+def list_cluster_media(
+    db: Session, cluster_id: int, offset: int = 0, limit: int = 100
+) -> tuple[FaceCluster, List[tuple[int, str]], int]:
+    """返回 (cluster, [(media_id, filename), ...], 去重后的媒体总数)。"""
     cluster = get_cluster_or_404(db, cluster_id)
     base_faces = (
         db.query(FaceEmbedding)
@@ -476,44 +479,23 @@ def list_cluster_media(db: Session, cluster_id: int, offset: int = 0, limit: int
     active_face_count = int(base_faces.count())
 
     # 返回“媒体去重”的列表（一个 media 只展示一次），否则前端分页/去重会出现空白与 hasMore 口径混乱。
-    media_id_query = (
-        base_faces.with_entities(FaceEmbedding.media_id)
-        .distinct()
-        .order_by(FaceEmbedding.media_id.asc())
-    )
-    total_media = media_id_query.count()
-    rep_media_id = int(media_id_query.first()[0]) if total_media > 0 else None
-
-    rep_face_id = None
-    if rep_media_id is not None:
-        rep_face_id_row = (
-            base_faces.with_entities(func.min(FaceEmbedding.id))
-            .filter(FaceEmbedding.media_id == rep_media_id)
-            .first()
-        )
-        if rep_face_id_row and rep_face_id_row[0] is not None:
-            rep_face_id = int(rep_face_id_row[0])
+    per_media = base_faces.group_by(FaceEmbedding.media_id).order_by(FaceEmbedding.media_id.asc())
+    total_media = int(base_faces.with_entities(func.count(func.distinct(FaceEmbedding.media_id))).scalar() or 0)
+
+    # 代表媒体 = media_id 最小者，代表人脸 = 该媒体下 id 最小的 face，一条语句取回
+    rep_row = per_media.with_entities(FaceEmbedding.media_id, func.min(FaceEmbedding.id)).first()
+    rep_media_id = int(rep_row[0]) if rep_row else None
+    rep_face_id = int(rep_row[1]) if rep_row and rep_row[1] is not None else None
 
     setattr(cluster, "_active_face_count", active_face_count)
     setattr(cluster, "_active_rep_media_id", rep_media_id)
     setattr(cluster, "_active_rep_face_id", rep_face_id)
 
-    media_ids = [int(mid) for (mid,) in media_id_query.offset(max(offset, 0)).limit(max(limit, 1)).all()]
-    if not media_ids:
-        return cluster, [], total_media
-
-    # 取每个 media 的一条 face（用于兼容旧接口返回 FaceEmbedding 列表）
-    rep_face_ids = (
-        base_faces.with_entities(func.min(FaceEmbedding.id))
-        .filter(FaceEmbedding.media_id.in_(media_ids))
-        .group_by(FaceEmbedding.media_id)
-        .all()
-    )
-    face_ids = [int(fid) for (fid,) in rep_face_ids]
-    faces = (
-        db.query(FaceEmbedding)
-        .filter(FaceEmbedding.id.in_(face_ids))
-        .order_by(FaceEmbedding.media_id.asc())
+    # 去重、分页与文件名 JOIN 在一条 SQL 内完成，直接返回元组，不实例化 FaceEmbedding/Media
+    rows = (
+        per_media.with_entities(FaceEmbedding.media_id, Media.filename)
+        .offset(max(offset, 0))
+        .limit(max(limit, 1))
         .all()
     )
-    return cluster, faces, total_media
+    return cluster, [(int(media_id), filename) for media_id, filename in rows], total_media
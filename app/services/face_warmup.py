@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional, Tuple
 
@@ -53,6 +55,19 @@ def _resolve_local_scan_roots(session: Session) -> List[str]:
     return deduped
 
 
+# 人脸聚类重建（暖机与手动触发）都在专用单线程里执行：不占 HTTP 线程池，同一时间最多一轮
+_REBUILD_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="face-rebuild")
+_rebuild_lock = threading.Lock()
+_rebuild_future: Optional[Future] = None
+
+
+def _rebuild_busy() -> bool:
+    """是否已有重建在排队或执行；调用方需持有 _rebuild_lock。"""
+    if _rebuild_future is not None and not _rebuild_future.done():
+        return True
+    return get_face_progress().snapshot().state in {FaceProgressState.RUNNING, FaceProgressState.CLUSTERING}
+
+
 def warmup_rebuild_face_clusters(
     base_path: Optional[str] = None,
     similarity_threshold: float = 0.65,
@@ -60,12 +75,26 @@ def warmup_rebuild_face_clusters(
     """人脸暖机：对“所有本地媒体路径”视作一个总仓库执行一轮聚类重建。
 
     - 当前实现仅支持本地文件系统路径；SMB/URL 会被忽略；
+    - 已有重建（含手动触发）在排队或执行时直接跳过，返回 None；
     - 返回 (media_count, face_count, cluster_count, base_paths_repr, pipeline_signature)。
     """
+    global _rebuild_future
+    with _rebuild_lock:
+        if _rebuild_busy():
+            print("[face-warmup] 已有人脸聚类重建在进行，跳过本轮暖机。")
+            return None
+        # 统计文件数较慢，先置为 RUNNING：期间的手动重建会被拒绝，进度查询也不会看到上一轮状态
+        get_face_progress().start(total_files=0, base_paths=[base_path] if base_path else [])
+        future = _REBUILD_EXECUTOR.submit(_run_warmup_face_clusters, similarity_threshold)
+        _rebuild_future = future
+    return future.result()
+
+
+def _run_warmup_face_clusters(similarity_threshold: float) -> Optional[Tuple[int, int, int, str, str]]:
+    progress = get_face_progress()
     db: Session = SessionLocal()
     try:
         roots = _resolve_local_scan_roots(db)
-        progress = get_face_progress()
         if not roots:
             progress.reset()
             print("[face-warmup] 未找到可用的本地媒体路径（可能全部为 SMB），跳过人脸暖机。")
@@ -86,7 +115,7 @@ def warmup_rebuild_face_clusters(
         except Exception:
             total_files = 0
 
-        progress.start(total_files=total_files, base_paths=roots)
+        progress.set_total_files(total_files, base_paths=roots)
 
         # 所有本地媒体路径视为同一总仓库，统一聚类。
         media_count, face_count, cluster_count, paths, version = face_cluster_service.rebuild_clusters_for_paths(
@@ -106,11 +135,52 @@ def warmup_rebuild_face_clusters(
     except ServiceError as exc:
         # 模型缺失等业务异常只记录日志，不影响主流程
         print(f"[face-warmup] 人脸暖机失败：{exc}")
-        get_face_progress().error(str(exc))
+        progress.error(str(exc))
         return None
     except Exception as exc:  # pragma: no cover - 运行期兜底
         print(f"[face-warmup] 未预期错误：{exc}")
-        get_face_progress().error(str(exc))
+        progress.error(str(exc))
         return None
     finally:
         db.close()
+
+
+def submit_rebuild_face_clusters(base_path: str, similarity_threshold: float) -> bool:
+    """提交一轮单目录聚类重建，立即返回；已有重建（含暖机）在排队或执行时返回 False。
+
+    进度与结果通过 get_face_progress()（/tasks/face-progress）查看。
+    """
+    global _rebuild_future
+    with _rebuild_lock:
+        if _rebuild_busy():
+            return False
+        # 提交前先置为 RUNNING，紧接着的进度查询不会看到上一轮的 done/idle
+        get_face_progress().start(total_files=0, base_paths=[base_path])
+        _rebuild_future = _REBUILD_EXECUTOR.submit(_run_rebuild_face_clusters, base_path, similarity_threshold)
+        return True
+
+
+def _run_rebuild_face_clusters(base_path: str, similarity_threshold: float) -> None:
+    progress = get_face_progress()
+    db: Session = SessionLocal()
+    try:
+        media_count, face_count, cluster_count, path, version = face_cluster_service.rebuild_clusters(
+            db,
+            base_path=base_path,
+            similarity_threshold=similarity_threshold,
+            progress=progress,
+        )
+        summary = (
+            f"media={media_count}, faces={face_count}, "
+            f"clusters={cluster_count}, base={path}, threshold={similarity_threshold}, version={version}"
+        )
+        print(f"[face-rebuild] 人脸聚类重建完成：{summary}")
+        progress.done(message=summary)
+    except ServiceError as exc:
+        print(f"[face-rebuild] 人脸聚类重建失败：{exc}")
+        progress.error(str(exc))
+    except Exception as exc:  # pragma: no cover - 运行期兜底
+        print(f"[face-rebuild] 未预期错误：{exc}")
+        progress.error(str(exc))
+    finally:
+        db.close()
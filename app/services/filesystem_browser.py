@@ -1,10 +1,28 @@
 import os
 import platform
+import stat
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from string import ascii_uppercase
 from typing import Iterable, List
 
+from app.services.common_folders import CommonFolderInfo, list_common_folders
+from app.services.ttl_cache import ttl_cache
+
+# 根目录/常用目录很少变化，设置向导反复请求时在此时间内直接复用上次结果
+_LISTING_TTL_SECONDS = 30.0
+
+# 子目录列表的短时缓存：键为解析后的路径，值为 (写入时间, 目录 mtime_ns, 条目)。
+# 增删/重命名子项会改变目录 mtime，立即失效；子目录权限变化不改 mtime，靠短 TTL 兜住
+_SUBDIR_CACHE_TTL_SECONDS = 2.0
+_SUBDIR_CACHE_MAX = 64
+_subdir_cache: "OrderedDict[str, tuple[float, int, List[DirectoryInfo]]]" = OrderedDict()
+_subdir_cache_lock = threading.Lock()
+
 
 @dataclass
 class DirectoryInfo:
@@ -16,8 +34,27 @@ class DirectoryInfo:
     is_symlink: bool = False
 
 
-def _to_info(path: Path, *, is_root: bool) -> DirectoryInfo:
-    resolved = path.resolve(strict=False)
+@lru_cache(maxsize=1024)
+def resolve_user_path(target: str) -> Path:
+    """expanduser + resolve，按输入字符串缓存。
+
+    resolve 会对每一级路径做 lstat/readlink，设置向导逐级浏览时同一路径会被反复解析；
+    符号链接被改指向后结果可能过期，设置媒体根路径后由调用方 cache_clear()。
+    """
+    return Path(target).expanduser().resolve()
+
+
+def _to_info(
+    path: Path,
+    *,
+    is_root: bool,
+    parent_resolved: bool = False,
+    is_symlink: bool | None = None,
+) -> DirectoryInfo:
+    if is_symlink is None:
+        is_symlink = path.is_symlink()
+    # 父目录已是规范路径且自身不是符号链接时，path 本身就是 resolve 的结果，省去逐级解析
+    resolved = path if parent_resolved and not is_symlink else path.resolve(strict=False)
     readable = os.access(resolved, os.R_OK)
     writable = os.access(resolved, os.W_OK)
     display_name = path.name or str(resolved)
@@ -27,7 +64,7 @@ def _to_info(path: Path, *, is_root: bool) -> DirectoryInfo:
         readable=readable,
         writable=writable,
         is_root=is_root,
-        is_symlink=path.is_symlink(),
+        is_symlink=is_symlink,
     )
 
 
@@ -72,30 +109,77 @@ def list_roots() -> List[DirectoryInfo]:
     return sorted(unique_paths, key=lambda item: item.name.lower())
 
 
-def list_subdirectories(target: str) -> List[DirectoryInfo]:
-    base_path = Path(target).expanduser().resolve()
-    if not base_path.exists():
-        raise FileNotFoundError(f"路径不存在：{base_path}")
-    if not base_path.is_dir():
-        raise NotADirectoryError(f"路径不是文件夹：{base_path}")
+@ttl_cache(_LISTING_TTL_SECONDS)
+def cached_roots() -> List[DirectoryInfo]:
+    """list_roots() 的 TTL 缓存版本；返回的列表为共享对象，调用方不要修改。"""
+    return list_roots()
+
+
+@ttl_cache(_LISTING_TTL_SECONDS)
+def cached_common_folders() -> List[CommonFolderInfo]:
+    """list_common_folders() 的 TTL 缓存版本；返回的列表为共享对象，调用方不要修改。"""
+    return list_common_folders()
+
+
+def invalidate_listing_caches() -> None:
+    """媒体根路径或媒体来源变更后调用：丢弃根目录/常用目录/子目录列表缓存。"""
+    cached_roots.invalidate()
+    cached_common_folders.invalidate()
+    with _subdir_cache_lock:
+        _subdir_cache.clear()
+
+
+def _scan_subdirectories(base_path: Path) -> List[DirectoryInfo]:
     try:
-        children = list(base_path.iterdir())
+        it = os.scandir(base_path)
     except PermissionError as exc:
         raise PermissionError(f"没有权限访问：{base_path}") from exc
 
     entries: List[DirectoryInfo] = []
-    for child in children:
-        if not child.is_dir():
-            continue
-        # 屏蔽隐藏目录（以 . 开头），减少噪音
-        name = child.name
-        if name.startswith("."):
-            continue
-        try:
-            info = _to_info(child, is_root=False)
-            entries.append(info)
-        except PermissionError:
-            # 某些路径 resolve 会触发权限错误，直接跳过
-            continue
+    with it:
+        for entry in it:
+            # 屏蔽隐藏目录（以 . 开头），减少噪音
+            if entry.name.startswith("."):
+                continue
+            # DirEntry 的类型判断优先用 dirent 里的 d_type，不必逐个 stat
+            try:
+                if not entry.is_dir():
+                    continue
+                is_symlink = entry.is_symlink()
+            except OSError:
+                continue
+            try:
+                info = _to_info(Path(entry.path), is_root=False, parent_resolved=True, is_symlink=is_symlink)
+                entries.append(info)
+            except PermissionError:
+                # 某些路径 resolve 会触发权限错误，直接跳过
+                continue
     entries.sort(key=lambda item: item.name.lower())
     return entries
+
+
+def list_subdirectories(target: str) -> List[DirectoryInfo]:
+    """列出子目录；返回的列表可能来自短时缓存，调用方不要修改。"""
+    base_path = resolve_user_path(target)
+    try:
+        st = base_path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        raise FileNotFoundError(f"路径不存在：{base_path}")
+    if not stat.S_ISDIR(st.st_mode):
+        raise NotADirectoryError(f"路径不是文件夹：{base_path}")
+
+    key = str(base_path)
+    now = time.monotonic()
+    with _subdir_cache_lock:
+        hit = _subdir_cache.get(key)
+        if hit is not None and now - hit[0] < _SUBDIR_CACHE_TTL_SECONDS and hit[1] == st.st_mtime_ns:
+            _subdir_cache.move_to_end(key)
+            return hit[2]
+
+    entries = _scan_subdirectories(base_path)
+    with _subdir_cache_lock:
+        _subdir_cache[key] = (now, st.st_mtime_ns, entries)
+        _subdir_cache.move_to_end(key)
+        while len(_subdir_cache) > _SUBDIR_CACHE_MAX:
+            _subdir_cache.popitem(last=False)
+    return entries
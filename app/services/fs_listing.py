@@ -0,0 +1,142 @@
+"""/fs/list、/fs/list-stream 的目录读取与分页。
+
+一次 os.scandir 得到过滤、排序好的完整列表，按 (目录, 过滤/排序参数, 目录 mtime) 短时缓存；
+翻页（offset 或游标）只在缓存列表上切片，不再每页重新遍历整个目录、逐项 stat。
+目录内增删/改名会改变目录 mtime，缓存随之失效；文件内容变化（大小、mtime）最多延迟一个 TTL。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException
+
+from app.db import SUPPORTED_IMAGE_EXTS, SUPPORTED_VIDEO_EXTS
+
+_THUMB_MEDIA_EXTS = {ext.lstrip(".") for ext in (*SUPPORTED_IMAGE_EXTS, *SUPPORTED_VIDEO_EXTS)}
+
+_LISTING_TTL = 5.0
+_LISTING_CACHE_MAX = 32
+
+# key -> (生成时间, 排好序的条目, 名称 -> 下标)
+_Listing = Tuple[float, List[dict], Dict[str, int]]
+_listing_cache: "OrderedDict[tuple, _Listing]" = OrderedDict()
+_listing_lock = threading.Lock()
+
+
+def _should_show(name: str, show_hidden: bool) -> bool:
+    if show_hidden:
+        return True
+    return not name.startswith(".")
+
+
+def open_dir(target: Path):
+    """打开目录迭代器；权限不足在这里就转成 403（流式响应开始前），而不是在迭代中途失败。"""
+    try:
+        return os.scandir(target)
+    except PermissionError:
+        raise HTTPException(status_code=403, detail={"code": "permission_denied", "message": "permission denied"})
+
+
+def iter_entries(it, root_id: str, path: str, *, show_hidden: bool, media_only: bool) -> Iterator[dict]:
+    """逐项产出目录条目（目录原始顺序），消费完或关闭生成器时释放目录句柄。"""
+    prefix = f"{path.strip('/')}/" if path else ""
+    with it:
+        for entry in it:
+            name = entry.name
+            if not _should_show(name, show_hidden):
+                continue
+            try:
+                # 与 Path.stat()/is_dir() 一致：跟随符号链接
+                stat = entry.stat()
+                is_dir = entry.is_dir()
+                ext = os.path.splitext(name)[1][1:].lower()
+                if (not is_dir) and media_only and ext not in _THUMB_MEDIA_EXTS:
+                    continue
+                thumb_url = None
+                if not is_dir and ext in _THUMB_MEDIA_EXTS:
+                    thumb_url = f"/fs/thumb?root_id={root_id}&path={quote(prefix + name)}"
+                item = {
+                    "name": name,
+                    "is_dir": is_dir,
+                    "size": 0 if is_dir else stat.st_size,
+                    "mtime": stat.st_mtime,
+                    "ext": ext,
+                    "writable": os.access(entry.path, os.W_OK),
+                    "thumbnail_url": thumb_url,
+                    "media_meta": None,
+                }
+            except (PermissionError, FileNotFoundError):
+                # 跳过无法访问或已被删除的文件（如 .VolumeIcon.icns）
+                continue
+            yield item
+
+
+def sorted_listing(
+    target: Path,
+    root_id: str,
+    path: str,
+    *,
+    show_hidden: bool,
+    sort: str,
+    order: str,
+    media_only: bool,
+) -> Tuple[List[dict], Dict[str, int]]:
+    """返回 (排序后的条目, 名称 -> 下标)；结果在缓存中共享，调用方不得修改。"""
+    try:
+        dir_mtime = target.stat().st_mtime_ns
+    except PermissionError:
+        raise HTTPException(status_code=403, detail={"code": "permission_denied", "message": "permission denied"})
+    key = (str(target), root_id, path, show_hidden, sort, order, media_only, dir_mtime)
+    now = time.monotonic()
+    with _listing_lock:
+        cached = _listing_cache.get(key)
+        if cached is not None and now - cached[0] < _LISTING_TTL:
+            _listing_cache.move_to_end(key)
+            return cached[1], cached[2]
+
+    items = list(iter_entries(open_dir(target), root_id, path, show_hidden=show_hidden, media_only=media_only))
+
+    def sort_key(it):
+        if sort == "mtime":
+            return it["mtime"]
+        if sort == "size":
+            return it["size"]
+        return it["name"].lower()
+
+    items.sort(key=sort_key, reverse=order == "desc")
+    index = {it["name"]: i for i, it in enumerate(items)}
+    with _listing_lock:
+        _listing_cache[key] = (now, items, index)
+        _listing_cache.move_to_end(key)
+        while len(_listing_cache) > _LISTING_CACHE_MAX:
+            _listing_cache.popitem(last=False)
+    return items, index
+
+
+def page(
+    items: List[dict],
+    index: Dict[str, int],
+    *,
+    offset: int,
+    limit: int,
+    cursor: Optional[str],
+) -> Tuple[List[dict], Optional[str]]:
+    """按 offset 或游标（上一页最后一项的 name，优先）切出一页，返回 (本页条目, 下一页游标)。"""
+    if cursor is not None:
+        pos = index.get(cursor)
+        if pos is None:
+            # 游标对应的条目已不在目录中：由客户端从头重新加载
+            raise HTTPException(status_code=400, detail={"code": "invalid_cursor", "message": "cursor not found"})
+        start = pos + 1
+    else:
+        start = offset
+    sliced = items[start : start + limit]
+    next_cursor = sliced[-1]["name"] if sliced and start + limit < len(items) else None
+    return sliced, next_cursor
@@ -4,17 +4,20 @@ import mimetypes
 import os
 import platform
 import shutil
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 from string import ascii_uppercase
 from typing import Iterable, List, Tuple
-from urllib.parse import quote
 
 import blake3
 
 from fastapi import HTTPException
 
 from app.db import SUPPORTED_IMAGE_EXTS, SUPPORTED_VIDEO_EXTS
+from app.services import fs_listing
 
 
 @dataclass
@@ -30,9 +33,6 @@ class RootEntry:
     platform: str
 
 
-_THUMB_MEDIA_EXTS = {ext.lstrip(".") for ext in (*SUPPORTED_IMAGE_EXTS, *SUPPORTED_VIDEO_EXTS)}
-
-
 def _hash_id(prefix: str, value: str) -> str:
     digest = blake3.blake3(value.encode("utf-8")).hexdigest()[:8]
     return f"{prefix}_{digest}"
@@ -72,7 +72,24 @@ def _posix_roots() -> Iterable[Path]:
                 yield child
 
 
+# 根目录列表缓存（生成时间, 结果）：/fs/list、/fs/file、/fs/thumb 每次都要按 root_id 找根，
+# 短 TTL 即可避免反复 stat/statvfs，又能较快发现新插入的移动盘
+_ROOTS_TTL = 5.0
+_roots_cache: tuple[float, List[RootEntry]] | None = None
+
+
 def discover_roots() -> List[RootEntry]:
+    global _roots_cache
+    now = time.monotonic()
+    cached = _roots_cache
+    if cached is not None and now - cached[0] < _ROOTS_TTL:
+        return list(cached[1])
+    entries = _discover_roots_uncached()
+    _roots_cache = (now, entries)
+    return list(entries)
+
+
+def _discover_roots_uncached() -> List[RootEntry]:
     system = _platform()
     roots = _windows_roots() if system.startswith("win") else _posix_roots()
     entries: List[RootEntry] = []
@@ -126,10 +143,17 @@ def _safe_join(root: RootEntry, relative_path: str) -> Path:
     return candidate
 
 
-def _should_show(name: str, show_hidden: bool) -> bool:
-    if show_hidden:
-        return True
-    return not name.startswith(".")
+def _resolve_dir(root_id: str, path: str) -> Path:
+    root = _resolve_root(root_id)
+    if not root.available:
+        raise HTTPException(status_code=503, detail={"code": "unavailable", "message": "root unavailable"})
+
+    target = _safe_join(root, path)
+    if not target.exists():
+        raise HTTPException(status_code=404, detail={"code": "not_found", "message": "path not found"})
+    if not target.is_dir():
+        raise HTTPException(status_code=400, detail={"code": "not_directory", "message": "path is not directory"})
+    return target
 
 
 def list_dir(
@@ -142,66 +166,27 @@ def list_dir(
     sort: str,
     order: str,
     media_only: bool,
+    cursor: str | None = None,
 ):
-    root = _resolve_root(root_id)
-    if not root.available:
-        raise HTTPException(status_code=503, detail={"code": "unavailable", "message": "root unavailable"})
+    target = _resolve_dir(root_id, path)
 
-    target = _safe_join(root, path)
-    if not target.exists():
-        raise HTTPException(status_code=404, detail={"code": "not_found", "message": "path not found"})
-    if not target.is_dir():
-        raise HTTPException(status_code=400, detail={"code": "not_directory", "message": "path is not directory"})
-
-    try:
-        entries = list(target.iterdir())
-    except PermissionError:
-        raise HTTPException(status_code=403, detail={"code": "permission_denied", "message": "permission denied"})
-
-    items = []
-    for entry in entries:
-        name = entry.name
-        if not _should_show(name, show_hidden):
-            continue
-        try:
-            stat = entry.stat()
-            is_dir = entry.is_dir()
-            size = 0 if is_dir else stat.st_size
-            ext = entry.suffix[1:].lower() if entry.suffix else ""
-            if (not is_dir) and media_only and ext not in _THUMB_MEDIA_EXTS:
-                continue
-            thumb_url = None
-            if not is_dir and ext in _THUMB_MEDIA_EXTS:
-                encoded = quote(f"{path.strip('/')}/" + name if path else name)
-                thumb_url = f"/fs/thumb?root_id={root_id}&path={encoded}"
-            items.append(
-                {
-                    "name": name,
-                    "is_dir": is_dir,
-                    "size": size,
-                    "mtime": stat.st_mtime,
-                    "ext": ext,
-                    "writable": os.access(entry, os.W_OK),
-                    "thumbnail_url": thumb_url,
-                    "media_meta": None,
-                }
-            )
-        except (PermissionError, FileNotFoundError):
-            # 跳过无法访问或已被删除的文件（如 .VolumeIcon.icns）
-            continue
+    items, index = fs_listing.sorted_listing(
+        target,
+        root_id,
+        path,
+        show_hidden=show_hidden,
+        sort=sort,
+        order=order,
+        media_only=media_only,
+    )
+    sliced, next_cursor = fs_listing.page(items, index, offset=offset, limit=limit, cursor=cursor)
+    return sliced, len(items), next_cursor
 
-    def sort_key(it):
-        if sort == "mtime":
-            return it["mtime"]
-        if sort == "size":
-            return it["size"]
-        return it["name"].lower()
 
-    reverse = order == "desc"
-    items.sort(key=sort_key, reverse=reverse)
-    total = len(items)
-    sliced = items[offset : offset + limit]
-    return sliced, total
+def iter_dir(root_id: str, path: str, *, show_hidden: bool, media_only: bool):
+    """不排序、不分页地逐项产出目录条目，供流式接口使用；路径校验与打开目录在返回前完成。"""
+    it = fs_listing.open_dir(_resolve_dir(root_id, path))
+    return fs_listing.iter_entries(it, root_id, path, show_hidden=show_hidden, media_only=media_only)
 
 
 def mkdir(root_id: str, path: str):
@@ -303,12 +288,29 @@ def guess_mime(path: Path) -> str:
     return mime or "application/octet-stream"
 
 
+# 指纹按 (路径, 设备, inode, mtime_ns, 大小) 记忆：文件未变时不再整文件重算
+_FINGERPRINT_CACHE_MAX = 4096
+_fingerprint_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_fingerprint_lock = threading.Lock()
+
+
 def compute_fingerprint(path: Path) -> str:
-    hasher = blake3.blake3()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            hasher.update(chunk)
-    return hasher.hexdigest()[:32]
+    st = path.stat()
+    key = (str(path), st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+    with _fingerprint_lock:
+        cached = _fingerprint_cache.get(key)
+        if cached is not None:
+            _fingerprint_cache.move_to_end(key)
+            return cached
+    # mmap 整文件交给 BLAKE3 多线程哈希，摘要与逐块 update 完全一致（已入库的指纹不受影响）
+    hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+    hasher.update_mmap(path)
+    fingerprint = hasher.hexdigest()[:32]
+    with _fingerprint_lock:
+        _fingerprint_cache[key] = fingerprint
+        while len(_fingerprint_cache) > _FINGERPRINT_CACHE_MAX:
+            _fingerprint_cache.popitem(last=False)
+    return fingerprint
 
 
 def thumb_path_for_fingerprint(fingerprint: str) -> Path:
@@ -319,20 +321,35 @@ def thumb_path_for_fingerprint(fingerprint: str) -> Path:
 
 
 def generate_thumbnail(src: Path, dest: Path, *, max_size=(480, 480)) -> bool:
+    # 先写临时文件再原子替换：并发请求看到 dest 存在时，它一定是完整的 JPEG
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if not _render_thumbnail(src, tmp, max_size):
+            return False
+        os.replace(tmp, dest)
+        return True
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _render_thumbnail(src: Path, dest: Path, max_size) -> bool:
     from PIL import Image
     from PIL import ImageOps
     import av  # type: ignore
 
-    dest.parent.mkdir(parents=True, exist_ok=True)
     ext = src.suffix.lower()
     try:
         if ext in SUPPORTED_IMAGE_EXTS:
             with Image.open(src) as img:
-                im = ImageOps.exif_transpose(img).copy()
-                im.thumbnail(max_size, Image.Resampling.LANCZOS if hasattr(Image, "Resampling") else Image.LANCZOS)
+                # 先缩小（JPEG 走 draft 解码）再按 EXIF 旋转，避免全尺寸解码与整图拷贝；
+                # 方向 5~8 会转 90°，缩小时先交换边界框宽高
+                box = tuple(max_size[::-1]) if img.getexif().get(0x0112, 1) in (5, 6, 7, 8) else max_size
+                img.thumbnail(box, Image.Resampling.LANCZOS if hasattr(Image, "Resampling") else Image.LANCZOS)
+                im = ImageOps.exif_transpose(img)
                 if im.mode not in {"RGB", "L"}:
                     im = im.convert("RGB")
-                im.save(dest, format="JPEG", quality=85)
+                im.save(dest, format="JPEG", quality=85, optimize=True)
                 return True
         if ext in SUPPORTED_VIDEO_EXTS:
             with av.open(str(src)) as container:
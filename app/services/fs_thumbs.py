@@ -0,0 +1,33 @@
+"""按指纹缓存的缩略图生成入口（/fs/thumb 与 /media/{key}/thumbnail 共用）。
+
+- 同一目标文件的并发请求只生成一次（single-flight），其余请求等待后直接复用；
+- 同时生成的数量限制在 CPU 核数以内：Pillow/PyAV 解码与缩放会释放 GIL，线程即可多核并行，
+  限流避免冷缓存图库首屏时几十个请求同时解码大图把内存和 CPU 打满。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+from app.services import fs_service
+from app.services.single_flight import SingleFlight
+
+_GENERATE_SLOTS = threading.BoundedSemaphore(max(2, os.cpu_count() or 2))
+_flights = SingleFlight()
+
+
+def ensure_thumbnail(src: Path, dest: Path, *, max_size=(480, 480)) -> bool:
+    """dest 已存在直接返回 True；否则生成（或等待正在进行的同一次生成），返回是否成功。"""
+    if dest.exists():
+        return True
+    return _flights.do(dest, lambda: _generate(src, dest, max_size))
+
+
+def _generate(src: Path, dest: Path, max_size) -> bool:
+    # 上一轮 single-flight 可能刚好在检查之后完成
+    if dest.exists():
+        return True
+    with _GENERATE_SLOTS:
+        return fs_service.generate_thumbnail(src, dest, max_size=max_size)
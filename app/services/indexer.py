@@ -44,7 +44,7 @@ def scan_into_db(
             # 扫描到视频：额外打上 video 标签（用于前端/客户端按类型过滤）
             if entry.media_type == "video":
                 if not video_tag_ready:
-                    exists = db.query(TagDefinition).filter(TagDefinition.name == "video").first()
+                    exists = db.query(TagDefinition.name).filter(TagDefinition.name == "video").first()
                     if not exists:
                         db.add(TagDefinition(name="video"))
                         db.flush()
@@ -8,16 +8,18 @@ import re
 import time
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Optional, Sequence, Dict
 
-from sqlalchemy import func, text
+from sqlalchemy import DateTime, Integer, bindparam, exists, func, literal, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Query, Session
 
 from app.db import Media, MediaTag, TagDefinition
 from app.services.query_filters import apply_active_media_filter
-from app.services import media_cache
+from app.services import media_cache, tag_events
 from app.schemas.media import DeleteBatchResp, FailedItemModel, MediaItem, MediaMetadata, PageResponse
 from app.services.asset_pipeline import (
     ArtifactType,
@@ -46,6 +48,8 @@ from app.services.fs_providers import is_smb_url, iter_bytes, stat_url
 from app.services.thumbnails_service import build_thumb_headers, get_or_generate_thumbnail
 from app.services import clip_service
 from app.services import fs_service
+from app.services import fs_thumbs
+from app.services.single_flight import SingleFlight
 
 
 @dataclass
@@ -117,39 +121,57 @@ def _to_media_item(
     include_thumb: bool = False,
     include_tag_state: bool = True,
 ) -> MediaItem:
-    liked_val: Optional[bool] = None
-    favorited_val: Optional[bool] = None
-    if include_tag_state:
-        liked_val = (
-            db.query(MediaTag)
-            .filter(MediaTag.media_id == media.id, MediaTag.tag_name == "like")
-            .first()
-            is not None
-        )
-        favorited_val = (
-            db.query(MediaTag)
-            .filter(MediaTag.media_id == media.id, MediaTag.tag_name == "favorite")
-            .first()
-            is not None
+    return _to_media_items_bulk(db, [media], include_thumb=include_thumb, include_tag_state=include_tag_state)[0]
+
+
+def _to_media_items_bulk(
+    db: Session,
+    medias: Sequence[Media],
+    *,
+    include_thumb: bool = False,
+    include_tag_state: bool = True,
+) -> List[MediaItem]:
+    """批量转换 MediaItem：整页的 like/favorite 状态用一条 IN 查询取回，避免逐条 SELECT。"""
+    tagged: set[tuple[int, str]] = set()
+    if include_tag_state and medias:
+        rows = (
+            db.query(MediaTag.media_id, MediaTag.tag_name)
+            .filter(
+                MediaTag.media_id.in_([m.id for m in medias]),
+                MediaTag.tag_name.in_(("like", "favorite")),
+            )
+            .all()
         )
+        tagged = {(int(media_id), str(tag_name)) for media_id, tag_name in rows}
 
-    created = media.created_at
-    created_str = created.isoformat() if isinstance(created, datetime) else str(created)
+    items: List[MediaItem] = []
+    for media in medias:
+        liked_val: Optional[bool] = None
+        favorited_val: Optional[bool] = None
+        if include_tag_state:
+            liked_val = (media.id, "like") in tagged
+            favorited_val = (media.id, "favorite") in tagged
+
+        created = media.created_at
+        created_str = created.isoformat() if isinstance(created, datetime) else str(created)
 
-    fingerprint = _ensure_fingerprint(db, media)
+        fingerprint = _ensure_fingerprint(db, media)
 
-    return MediaItem(
-        id=media.id,
-        url=f"/media-resource/{media.id}",
-        resourceUrl=f"/media-resource/{media.id}",
-        type=media.media_type,
-        filename=media.filename,
-        createdAt=created_str,
-        thumbnailUrl=(f"/media/{fingerprint}/thumbnail" if include_thumb and fingerprint else None),
-        liked=liked_val,
-        favorited=favorited_val,
-        fingerprint=fingerprint,
-    )
+        items.append(
+            MediaItem(
+                id=media.id,
+                url=f"/media-resource/{media.id}",
+                resourceUrl=f"/media-resource/{media.id}",
+                type=media.media_type,
+                filename=media.filename,
+                createdAt=created_str,
+                thumbnailUrl=(f"/media/{fingerprint}/thumbnail" if include_thumb and fingerprint else None),
+                liked=liked_val,
+                favorited=favorited_val,
+                fingerprint=fingerprint,
+            )
+        )
+    return items
 
 
 def _require_media(db: Session, media_id: int) -> Media:
@@ -161,6 +183,13 @@ def _require_media(db: Session, media_id: int) -> Media:
     return media
 
 
+def _find_tag_name(db: Session, tag: str, *, case_insensitive: bool = False) -> Optional[str]:
+    """只查 name 列判断标签是否存在，返回库中的实际名称（不实例化 ORM 对象）。"""
+    cond = TagDefinition.name.ilike(tag) if case_insensitive else TagDefinition.name == tag
+    row = db.query(TagDefinition.name).filter(cond).first()
+    return row[0] if row else None
+
+
 def _parse_range(range_header: str, file_size: int) -> tuple[int, int]:
     try:
         units, ranges = range_header.split("=", 1)
@@ -222,10 +251,12 @@ def _record_cache_hits(db: Session, media_ids: Sequence[int]) -> None:
         db.rollback()
 
 
+@lru_cache(maxsize=1024)
 def _derive_seed_numbers(seed: str) -> tuple[int, int]:
-    digest = hashlib.sha256(seed.encode("utf-8")).hexdigest()
-    factor = int(digest[:8], 16) or 1
-    modulus = int(digest[8:16], 16) or 2147483647
+    # 同一会话翻页复用同一个 seed，按 seed 缓存；直接取摘要字节，省去 hex 编解码（结果与原 hex 切片一致）
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    factor = int.from_bytes(digest[:4], "big") or 1
+    modulus = int.from_bytes(digest[4:8], "big") or 2147483647
     if modulus <= factor:
         modulus = 2147483647
     return factor, modulus
@@ -258,13 +289,16 @@ def _query_cached_media_rows(
 
 
 def _rows_to_media_items(db: Session, rows) -> List[MediaItem]:
+    mappings = [row._mapping for row in rows]
+    # 一次 IN 查询取回整页 Media，避免逐行 SELECT
+    page_ids = [int(mapping["media_id"]) for mapping in mappings]
+    media_map = {m.id: m for m in db.query(Media).filter(Media.id.in_(page_ids)).all()} if page_ids else {}
     items: List[MediaItem] = []
-    for row in rows:
-        mapping = row._mapping
+    for mapping in mappings:
         media_id = int(mapping["media_id"])
         created = mapping["created_at"]
         created_str = created.isoformat() if isinstance(created, datetime) else str(created)
-        media = db.query(Media).filter(Media.id == media_id).first()
+        media = media_map.get(media_id)
         fingerprint: Optional[str] = None
         if media and media.absolute_path:
             fingerprint = _ensure_fingerprint(db, media)
@@ -427,11 +461,10 @@ def _search_media_by_text(
         # - 否则会把 CLIP/文本检索的无关结果并进来，导致前端看到大量不相关内容。
         #
         # 使用 ilike 确保大小写不敏感；但若 tag 不存在，则直接报错，避免静默放宽过滤。
-        tag_def = db.query(TagDefinition).filter(TagDefinition.name.ilike(tag)).first()
-        if not tag_def:
+        actual_tag_name = _find_tag_name(db, tag, case_insensitive=True)
+        if actual_tag_name is None:
             raise InvalidTagError("invalid tag")
 
-        actual_tag_name = tag_def.name
         allowed_ids = [
             int(mid)
             for (mid,) in db.query(MediaTag.media_id)
@@ -474,12 +507,8 @@ def _search_media_by_text(
         .all()
     )
     media_map = {m.id: m for m in media_rows}
-    items: List[MediaItem] = []
-    for mid in page_ids:
-        media = media_map.get(mid)
-        if not media:
-            continue
-        items.append(_to_media_item(db, media, include_thumb=True))
+    ordered = [media_map[mid] for mid in page_ids if mid in media_map]
+    items = _to_media_items_bulk(db, ordered, include_thumb=True)
 
     _record_cache_hits(db, [item.id for item in items])
     return PageResponse(items=items, offset=offset, hasMore=has_more)
@@ -505,8 +534,7 @@ def get_media_page(
         return _search_media_by_text(db, query_text=query_text, tag=tag, search_mode=search_mode, offset=offset, limit=limit)
 
     if tag:
-        tag_def = db.query(TagDefinition).filter(TagDefinition.name == tag).first()
-        if not tag_def:
+        if _find_tag_name(db, tag) is None:
             raise InvalidTagError("invalid tag")
         q = (
             db.query(Media)
@@ -517,7 +545,7 @@ def get_media_page(
         q = _filter_active_media(q)
         rows = q.offset(offset).limit(limit + 1).all()
         sliced = rows[:limit]
-        items = [_to_media_item(db, m, include_thumb=True) for m in sliced]
+        items = _to_media_items_bulk(db, sliced, include_thumb=True)
         has_more = len(rows) > limit
         _record_cache_hits(db, [m.id for m in sliced])
         return PageResponse(items=items, offset=offset, hasMore=has_more)
@@ -547,23 +575,42 @@ def get_media_page(
     return PageResponse(items=items, offset=offset, hasMore=has_more)
 
 
-def add_tag(db: Session, *, media_id: int, tag: str) -> None:
-    tag_def = db.query(TagDefinition).filter(TagDefinition.name == tag).first()
-    if not tag_def:
-        raise InvalidTagError("invalid tag")
-    media = db.query(Media).filter(Media.id == media_id).first()
-    if not media:
-        raise MediaNotFoundError("media not found")
-    existing = (
-        db.query(MediaTag)
-        .filter(MediaTag.media_id == media_id, MediaTag.tag_name == tag)
-        .first()
+# 手动打标签的单条 INSERT：标签定义与媒体存在才插入、(media_id, tag_name) 冲突则忽略；
+# 正常路径一次往返，插入失败时才回查具体原因
+_INSERT_MANUAL_TAG = (
+    sqlite_insert(MediaTag)
+    .from_select(
+        [MediaTag.media_id, MediaTag.tag_name, MediaTag.created_at, MediaTag.source_model, MediaTag.confidence],
+        select(
+            bindparam("media_id", type_=Integer),
+            TagDefinition.name,
+            bindparam("created_at", type_=DateTime),
+            literal("manual"),
+            literal(1.0),
+        ).where(
+            TagDefinition.name == bindparam("tag"),
+            exists().where(Media.id == bindparam("media_id", type_=Integer)),
+        ),
     )
-    if existing:
-        raise TagAlreadyExistsError("tag already exists for media")
-    db.add(MediaTag(media_id=media_id, tag_name=tag, source_model="manual", confidence=1.0))
-    media_cache.sync_tag_snapshot(db, [media_id])
+    .on_conflict_do_nothing(index_elements=[MediaTag.media_id, MediaTag.tag_name])
+    # 参数是绑定变量而不是待插入的行：关闭 ORM 批量插入的参数解释
+    .execution_options(dml_strategy="raw")
+)
+
+
+def add_tag(db: Session, *, media_id: int, tag: str) -> None:
     try:
+        inserted = db.execute(
+            _INSERT_MANUAL_TAG,
+            {"media_id": media_id, "tag": tag, "created_at": datetime.utcnow()},
+        ).rowcount
+        if not inserted:
+            if _find_tag_name(db, tag) is None:
+                raise InvalidTagError("invalid tag")
+            if db.query(Media.id).filter(Media.id == media_id).first() is None:
+                raise MediaNotFoundError("media not found")
+            raise TagAlreadyExistsError("tag already exists for media")
+        media_cache.sync_tag_snapshot(db, [media_id])
         db.commit()
     except OperationalError as exc:
         db.rollback()
@@ -573,15 +620,15 @@ def add_tag(db: Session, *, media_id: int, tag: str) -> None:
 
 
 def remove_tag(db: Session, *, media_id: int, tag: str) -> None:
-    mt = (
-        db.query(MediaTag)
-        .filter(MediaTag.media_id == media_id, MediaTag.tag_name == tag)
-        .first()
-    )
-    if not mt:
-        raise TagNotFoundError("tag not set for media")
     try:
-        db.delete(mt)
+        # 单条 DELETE，按影响行数判断是否存在，省去先 SELECT 再删除的往返
+        removed = (
+            db.query(MediaTag)
+            .filter(MediaTag.media_id == media_id, MediaTag.tag_name == tag)
+            .delete(synchronize_session=False)
+        )
+        if not removed:
+            raise TagNotFoundError("tag not set for media")
         media_cache.sync_tag_snapshot(db, [media_id])
         db.commit()
     except OperationalError as exc:
@@ -591,7 +638,20 @@ def remove_tag(db: Session, *, media_id: int, tag: str) -> None:
         raise ServiceError("failed to remove tag") from exc
 
 
+# 标签列表缓存：(标签版本号, 生成时间, 结果)。版本号由 tag_events 在标签相关提交后递增；
+# TTL 兜底覆盖绕过 ORM 的写入（原生 SQL / 其他进程）
+_TAG_LIST_TTL = 30.0
+_tag_list_cache: tuple[int, float, List[str]] | None = None
+
+
 def list_tags(db: Session) -> List[str]:
+    global _tag_list_cache
+    version = tag_events.tags_version()
+    now = time.monotonic()
+    cached = _tag_list_cache
+    if cached is not None and cached[0] == version and now - cached[1] < _TAG_LIST_TTL:
+        return list(cached[2])
+
     # 口径：
     # - 返回“已使用的标签”（MediaTag 中出现过的）
     # - 但基础交互标签 like/favorite 需要始终可见（即便当前库里还没被用过）
@@ -614,12 +674,17 @@ def list_tags(db: Session) -> List[str]:
     bases = {name for (name,) in base_rows}
 
     merged = sorted(used | bases)
-    return merged
+    _tag_list_cache = (version, now, merged)
+    return list(merged)
 
 
 # -------- 标签译文支持 --------
+_TAG_TRANSLATION_FILE = Path(__file__).resolve().parent.parent / "data" / "tags-translate.csv"
 _TAG_TRANSLATION_CACHE: Dict[str, str] | None = None
-_TAG_TRANSLATION_MTIME: float | None = None
+_TAG_TRANSLATION_MTIME: int | None = None
+# 两次 stat 之间的最短间隔：/events/tags 每个连接每批都会取译表，间隔内直接返回缓存，不碰文件系统
+_TAG_TRANSLATION_CHECK_INTERVAL = 1.0
+_TAG_TRANSLATION_CHECKED_AT: float | None = None
 _TRANSLATION_NORMALIZE_PATTERN = re.compile(r"[()\s-]+")
 
 
@@ -638,13 +703,21 @@ def _load_tag_translations() -> Dict[str, str]:
     从 data/tags-translate.csv 读取译表：每行 `英文,译文`，无表头。
     - 文件缺失或读取失败返回空表
     - 格式要求恰好一个逗号；遇到格式错误返回空表（与安卓端容错一致）
-    - 基于文件 mtime 做简易缓存
+    - 基于文件 mtime（纳秒）做缓存，且 1 秒内最多 stat 一次
     """
-    global _TAG_TRANSLATION_CACHE, _TAG_TRANSLATION_MTIME
-    file_path = Path(__file__).resolve().parent.parent / "data" / "tags-translate.csv"
+    global _TAG_TRANSLATION_CACHE, _TAG_TRANSLATION_MTIME, _TAG_TRANSLATION_CHECKED_AT
+    now = time.monotonic()
+    if (
+        _TAG_TRANSLATION_CACHE is not None
+        and _TAG_TRANSLATION_CHECKED_AT is not None
+        and now - _TAG_TRANSLATION_CHECKED_AT < _TAG_TRANSLATION_CHECK_INTERVAL
+    ):
+        return _TAG_TRANSLATION_CACHE
+    _TAG_TRANSLATION_CHECKED_AT = now
+    file_path = _TAG_TRANSLATION_FILE
 
     try:
-        mtime = file_path.stat().st_mtime
+        mtime = file_path.stat().st_mtime_ns
     except FileNotFoundError:
         _TAG_TRANSLATION_CACHE = {}
         _TAG_TRANSLATION_MTIME = None
@@ -689,6 +762,18 @@ def list_tags_with_translation(db: Session) -> List[Dict[str, str | None]]:
     return enriched
 
 
+@lru_cache(maxsize=4096)
+def parse_tag_cursor(value: str) -> datetime:
+    """解析增量标签游标（ISO8601，允许 Z 后缀）。
+
+    客户端轮询/重连时反复携带同一个游标，按原始字符串缓存解析结果；非法格式抛 ValueError（不缓存）。
+    """
+    raw = value.strip()
+    if raw.endswith("Z"):
+        raw = raw[:-1] + "+00:00"
+    return datetime.fromisoformat(raw)
+
+
 def list_tags_with_translation_since(
     db: Session,
     *,
@@ -765,7 +850,15 @@ def _resolve_media_by_key(db: Session, key: str) -> Media:
     return media
 
 
+# 同一 key 的并发缩略图请求共用一次查找（查库、补算指纹、生成），图库冷启动时不重复读盘
+_thumbnail_flights = SingleFlight()
+
+
 def get_thumbnail_payload(db: Session, *, key: str) -> ThumbnailPayload:
+    return _thumbnail_flights.do(key, lambda: _build_thumbnail_payload(db, key))
+
+
+def _build_thumbnail_payload(db: Session, key: str) -> ThumbnailPayload:
     media = _resolve_media_by_key(db, key)
     if (not is_smb_url(media.absolute_path)) and (not os.path.exists(media.absolute_path)):
         raise FileNotFoundOnDiskError("file not found")
@@ -775,10 +868,8 @@ def get_thumbnail_payload(db: Session, *, key: str) -> ThumbnailPayload:
         raise ThumbnailUnavailableError("fingerprint unavailable")
 
     dest = fs_service.thumb_path_for_fingerprint(fingerprint)
-    if not dest.exists():
-        ok = fs_service.generate_thumbnail(Path(media.absolute_path), dest, max_size=(480, 480))
-        if not ok or not dest.exists():
-            raise ThumbnailUnavailableError("thumbnail not available")
+    if not fs_thumbs.ensure_thumbnail(Path(media.absolute_path), dest, max_size=(480, 480)):
+        raise ThumbnailUnavailableError("thumbnail not available")
 
     headers = build_thumb_headers(str(dest))
     media_type = headers.get("Content-Type", "image/jpeg")
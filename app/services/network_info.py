@@ -5,6 +5,7 @@ import platform
 from typing import List, Callable, Optional
 import threading
 import time
+from functools import lru_cache
 
 
 def _try_primary_ip() -> str | None:
@@ -94,7 +95,9 @@ def list_lan_ips(max_age: float = 10.0, force_refresh: bool = False) -> List[str
         return list(ips)
 
 
+@lru_cache(maxsize=1)
 def detect_os_name() -> str:
+    """进程运行期间操作系统不会变化，首次探测后缓存。"""
     sys = platform.system().lower()
     if sys.startswith("win"):
         return "windows"
@@ -28,18 +28,29 @@ def _safe_count_media_files(root: Path) -> int:
     return cnt
 
 
-def start_scan_job(source_id: int, root_path: str, background: BackgroundTasks) -> str:
+def _create_scan_job(source_id: int) -> str:
     job_id = str(uuid.uuid4())
     # 先落库 running 状态
     with SessionLocal() as db:
         db.add(ScanJob(job_id=job_id, source_id=source_id, state="running", scanned_count=0, started_at=datetime.utcnow()))
         db.commit()
+    return job_id
 
+
+def start_scan_job(source_id: int, root_path: str, background: BackgroundTasks) -> str:
+    job_id = _create_scan_job(source_id)
     # 后台执行实际扫描
     background.add_task(_run_scan_job, job_id, root_path, source_id)
     return job_id
 
 
+def run_scan_job(source_id: int, root_path: str) -> str:
+    """在当前线程执行一次完整扫描任务（已处于后台任务中的调用方使用），同样记录 ScanJob。"""
+    job_id = _create_scan_job(source_id)
+    _run_scan_job(job_id, root_path, source_id)
+    return job_id
+
+
 def _run_scan_job(job_id: str, root_path: str, source_id: int) -> None:
     db: Optional[Session] = None
     mounted_ok = False
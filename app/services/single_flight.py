@@ -0,0 +1,42 @@
+"""单飞（single-flight）：同一 key 的并发调用只真正执行一次，其余调用方等待并共享结果。
+
+用于缩略图这类“冷缓存时多个请求同时要同一份产物”的场景：首个调用方执行，
+其余线程阻塞等待同一个 Future；执行结束（成功或异常）即从表中移除，不做结果缓存。
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """执行 fn 或等待同 key 正在进行的那次调用；异常同样会传给所有等待方。"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = Future()
+                self._calls[key] = call
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            call.set_exception(exc)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
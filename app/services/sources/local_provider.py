@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import time
 from contextlib import contextmanager
 from pathlib import Path
 from typing import ContextManager, Generator, Iterable, Optional, Tuple
@@ -11,10 +12,55 @@ from fs.base import FS
 from fs.osfs import OSFS
 from fs.wrap import read_only
 
+from app.db import SUPPORTED_MEDIA_EXTS
 from app.schemas.sources import SourceType, SourceValidateRequest, SourceValidateResponse
 from app.services.sources.registry import ProviderCapability, register_provider
 
 
+_VALIDATE_SAMPLES = 10
+# 验证只为给出量级：遍历条目数或耗时到上限即停止，返回的计数标记为非精确
+_VALIDATE_MAX_ENTRIES = 50_000
+_VALIDATE_MAX_SECONDS = 2.0
+
+
+def _count_media_files(root: str) -> Tuple[int, list[str], bool]:
+    """统计目录树下的媒体文件数并取前几个样例路径，返回 (数量, 样例, 是否遍历完整)。
+
+    与 os.walk(root) 口径一致（不进入符号链接目录、跳过无法读取的子目录），但直接用 scandir 的
+    DirEntry：类型判断走 dirent 缓存，后缀用字符串切片判断，每个文件不再构造 Path 对象。
+    """
+    total = 0
+    samples: list[str] = []
+    visited = 0
+    deadline = time.monotonic() + _VALIDATE_MAX_SECONDS
+    stack = [root]
+    while stack:
+        if visited >= _VALIDATE_MAX_ENTRIES or time.monotonic() > deadline:
+            return total, samples, False
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                visited += 1
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                    continue
+                name = entry.name
+                dot = name.rfind(".")
+                if dot > 0 and name[dot:].lower() in SUPPORTED_MEDIA_EXTS:
+                    total += 1
+                    if len(samples) < _VALIDATE_SAMPLES:
+                        samples.append(entry.path)
+    return total, samples, True
+
+
 class LocalFSProvider:
     name = "local"
     priority = 0
@@ -103,7 +149,6 @@ class LocalFSProvider:
         if not payload.path:
             raise HTTPException(status_code=422, detail="path required")
 
-        exts = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".mp4", ".mov", ".avi", ".mkv", ".wmv", ".flv"}
         p = Path(payload.path).expanduser().resolve()
         if not p.exists():
             raise HTTPException(status_code=404, detail="路径不存在")
@@ -112,19 +157,13 @@ class LocalFSProvider:
         if not os.access(p, os.R_OK):
             raise HTTPException(status_code=403, detail="无读取权限")
 
-        total = 0
-        samples: list[str] = []
-        for root, _dirs, files in os.walk(p):
-            for fname in files:
-                if Path(fname).suffix.lower() in exts:
-                    total += 1
-                    if len(samples) < 10:
-                        samples.append(str(Path(root) / fname))
+        total, samples, exact = _count_media_files(str(p))
         return SourceValidateResponse(
             ok=True,
             readable=True,
             absPath=str(p),
             estimatedCount=total,
+            exact=exact,
             samples=samples,
             note="只读验证通过，不会写入或删除此目录下文件",
         )
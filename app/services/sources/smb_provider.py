@@ -1,10 +1,8 @@
 from __future__ import annotations
 
 import uuid
-from collections import deque
 from contextlib import contextmanager
 from dataclasses import dataclass
-from pathlib import Path
 from typing import ContextManager, Generator, Iterable, Optional, Tuple
 from urllib.parse import unquote, urlparse
 
@@ -13,7 +11,7 @@ from fs import open_fs
 from fs.base import FS
 from fs.wrap import read_only
 from smbprotocol.connection import Connection  # type: ignore
-from smbprotocol.file_info import FileAttributes, FileInformationClass  # type: ignore
+from smbprotocol.file_info import FileAttributes  # type: ignore
 from smbprotocol.open import (  # type: ignore
     CreateDisposition,
     CreateOptions,
@@ -28,6 +26,7 @@ from smbprotocol.tree import TreeConnect  # type: ignore
 from app.schemas.sources import SourceType, SourceValidateRequest, SourceValidateResponse
 from app.services.credentials import clear_smb_password, get_smb_password, store_smb_password
 from app.services.sources.registry import ProviderCapability, register_provider
+from app.services.sources.smb_validate import sample_media
 
 
 @dataclass
@@ -201,58 +200,7 @@ class SMBFSProvider:
                 CreateOptions.FILE_DIRECTORY_FILE,
             )
 
-            exts = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".mp4", ".mov", ".avi", ".mkv", ".wmv", ".flv"}
-            total = 0
-            samples: list[str] = []
-            max_dirs = 50
-            max_files = 2000
-            visited = 0
-            queue = deque([""])
-            while queue and visited < max_dirs and total < max_files and len(samples) < 10:
-                rel = queue.popleft()
-                visited += 1
-                cur_path = (dir_path + ('\\' if dir_path and rel else '') + rel) if rel else dir_path
-                cur = Open(tree, cur_path)
-                cur.create(
-                    ImpersonationLevel.Impersonation,
-                    FilePipePrinterAccessMask.GENERIC_READ,
-                    0,
-                    ShareAccess.FILE_SHARE_READ,
-                    CreateDisposition.FILE_OPEN,
-                    CreateOptions.FILE_DIRECTORY_FILE,
-                )
-                try:
-                    entries = cur.query_directory('*', FileInformationClass.FILE_DIRECTORY_INFORMATION)
-                    for entry in entries:
-                        raw = entry['file_name']
-                        if hasattr(raw, 'get_value'):
-                            b = raw.get_value()
-                            try:
-                                name = b.decode('utf-16-le').rstrip('\x00')
-                            except Exception:
-                                name = ''.join(chr(x) for x in b if x > 0)
-                        else:
-                            name = str(raw)
-                        if name in ('.', '..'):
-                            continue
-                        attrs_field = entry['file_attributes']
-                        attrs_val = int(getattr(attrs_field, 'value', attrs_field))
-                        is_dir = bool(attrs_val & 0x10)
-                        child_rel = name if not rel else rel + '/' + name
-                        if is_dir:
-                            if len(queue) < max_dirs:
-                                queue.append(child_rel)
-                        else:
-                            if Path(name).suffix.lower() in exts:
-                                total += 1
-                                if len(samples) < 10:
-                                    samples.append(f"smb://{host}/{payload.share}/" + (sub + '/' if sub else '') + child_rel)
-                            else:
-                                total += 1
-                            if total >= max_files:
-                                break
-                finally:
-                    cur.close()
+            result = sample_media(tree, dir_path, f"smb://{host}/{payload.share}/" + (sub + '/' if sub else ''))
 
             handle.close()
             tree.disconnect()
@@ -263,8 +211,9 @@ class SMBFSProvider:
                 ok=True,
                 readable=True,
                 absPath=f"smb://{host}/{payload.share}/" + sub,
-                estimatedCount=total,
-                samples=samples,
+                estimatedCount=result.total,
+                exact=result.exact,
+                samples=result.samples,
                 note="只读验证通过，不会写入或删除此目录下文件",
             )
         except HTTPException:
@@ -0,0 +1,94 @@
+"""标签变更通知：TagDefinition 提交后唤醒订阅方（/events/tags SSE），空闲连接不再轮询数据库。
+
+写入方无需改动：通过 Session 事件在 flush 时标记“本事务新增了标签定义”，commit 后统一通知；
+rollback 则丢弃标记。通知只是“有新标签”的信号，订阅方自行按游标查询增量。
+
+同一套事件还维护一个标签版本号：任何提交里新增/删除了 MediaTag 或 TagDefinition（含 ORM 批量
+insert/delete/update）都会使版本号 +1，供标签列表缓存判断是否失效。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db import MediaTag, TagDefinition
+
+_ADDED_FLAG = "tag_definitions_added"
+_CHANGED_FLAG = "tags_changed"
+_TAG_MODELS = (MediaTag, TagDefinition)
+
+_lock = threading.Lock()
+_subscribers: dict[asyncio.Event, asyncio.AbstractEventLoop] = {}
+_version = 0
+
+
+def tags_version() -> int:
+    """当前标签版本号；标签相关数据每提交一次变更就递增。"""
+    return _version
+
+
+def subscribe() -> asyncio.Event:
+    """在事件循环内调用；有新标签提交时返回的 Event 会被 set（调用方负责 clear）。"""
+    signal = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _subscribers[signal] = loop
+    return signal
+
+
+def unsubscribe(signal: asyncio.Event) -> None:
+    with _lock:
+        _subscribers.pop(signal, None)
+
+
+def publish() -> None:
+    """通知所有订阅方；可在任意线程调用（扫描/打标签的写入通常发生在后台线程）。"""
+    with _lock:
+        targets = list(_subscribers.items())
+    for signal, loop in targets:
+        try:
+            loop.call_soon_threadsafe(signal.set)
+        except RuntimeError:
+            # 事件循环已关闭：连接早已断开，顺手清理
+            unsubscribe(signal)
+
+
+@event.listens_for(Session, "before_flush")
+def _mark_tag_definitions(session: Session, _flush_context, _instances) -> None:
+    if any(isinstance(obj, TagDefinition) for obj in session.new):
+        session.info[_ADDED_FLAG] = True
+        session.info[_CHANGED_FLAG] = True
+    elif any(isinstance(obj, _TAG_MODELS) for obj in session.new) or any(
+        isinstance(obj, _TAG_MODELS) for obj in session.deleted
+    ):
+        session.info[_CHANGED_FLAG] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_tag_changes(orm_execute_state) -> None:
+    # query(...).delete()/update() 与 session.execute(insert/delete/update(...)) 不经过 flush，单独识别
+    if not (orm_execute_state.is_insert or orm_execute_state.is_delete or orm_execute_state.is_update):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _TAG_MODELS):
+        orm_execute_state.session.info[_CHANGED_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    global _version
+    if session.info.pop(_CHANGED_FLAG, False):
+        with _lock:
+            _version += 1
+    if session.info.pop(_ADDED_FLAG, False):
+        publish()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_ADDED_FLAG, None)
+    session.info.pop(_CHANGED_FLAG, None)
@@ -34,6 +34,7 @@ _REPO_ROOT = Path(__file__).resolve().parents[2]
 THUMBNAILS_DIR = _REPO_ROOT / "thumbnails"
 THUMBNAILS_DIR.mkdir(exist_ok=True)
 MAX_THUMB_SIZE = (480, 480)
+_EXIF_ORIENTATION = 0x0112
 
 if hasattr(Image, "Resampling"):
     _LANCZOS = Image.Resampling.LANCZOS  # Pillow >= 9.1
@@ -98,12 +99,14 @@ def _should_regenerate_local(src_path: str, thumb_path: Path) -> bool:
 
 def _save_image_thumbnail(img: Image.Image, dest: Path) -> None:
     dest.parent.mkdir(parents=True, exist_ok=True)
-    # 关键：应用 EXIF Orientation（手机竖拍常见），否则缩略图会“被旋转”但原图在浏览器里可能是正确的。
-    im = ImageOps.exif_transpose(img).copy()
-    im.thumbnail(MAX_THUMB_SIZE, _LANCZOS)
+    # 先在未解码的原图上 thumbnail：JPEG 会走 draft（解码阶段 DCT 缩放），不再先解出整张全尺寸大图再缩放。
+    # EXIF Orientation（手机竖拍常见）放到缩小之后再应用；方向为 5~8（需转 90°）时先交换边界框宽高，结果尺寸不变。
+    box = MAX_THUMB_SIZE[::-1] if img.getexif().get(_EXIF_ORIENTATION, 1) in (5, 6, 7, 8) else MAX_THUMB_SIZE
+    img.thumbnail(box, _LANCZOS)
+    im = ImageOps.exif_transpose(img)
     if im.mode not in {"RGB", "L"}:
         im = im.convert("RGB")
-    im.save(dest, format="JPEG", quality=85)
+    im.save(dest, format="JPEG", quality=85, optimize=True)
 
 
 def _generate_image_thumbnail(src: str, dest: Path) -> bool:
@@ -0,0 +1,44 @@
+"""无参函数的单值 TTL 缓存。
+
+用于“结果很少变化、但前端会反复轮询”的列表（如设置向导里的根目录、常用目录），
+过期前直接返回上次结果；数据可能已变化时由调用方 invalidate()。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import namedtuple
+from functools import wraps
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_CachedValue = namedtuple("_CachedValue", "expires data")
+
+
+def ttl_cache(seconds: float) -> Callable[[Callable[[], T]], Callable[[], T]]:
+    def decorator(fn: Callable[[], T]) -> Callable[[], T]:
+        lock = threading.Lock()
+        slot: list[Optional[_CachedValue]] = [None]
+
+        @wraps(fn)
+        def wrapper() -> T:
+            now = time.monotonic()
+            with lock:
+                cached = slot[0]
+            if cached is not None and cached.expires > now:
+                return cached.data
+            data = fn()
+            with lock:
+                slot[0] = _CachedValue(now + seconds, data)
+            return data
+
+        def invalidate() -> None:
+            with lock:
+                slot[0] = None
+
+        wrapper.invalidate = invalidate  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import os
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,6 +7,7 @@ from pathlib import Path
 import socket
 import subprocess
 
+import anyio
 import uvicorn
 
 from app.db import (
@@ -33,7 +35,8 @@ from app.services.auto_scan_service import ensure_auto_scan_service, get_auto_sc
 from app.services.incoming_dir import ensure_incoming_dir
 
 
-app = FastAPI(title="Media App API", version="1.0.0")
+# 默认用 orjson 序列化响应（requirements 已包含 orjson），列表类大响应编码更快
+app = FastAPI(title="Media App API", version="1.0.0", default_response_class=ORJSONResponse)
 app.state.frontend_available = False
 app.state.frontend_dist: Path | None = None
 
@@ -63,9 +66,9 @@ app.include_router(collection_router)
 app.include_router(events_router)
 app.include_router(gate_router)
 
-# 轻量健康检查，供 Android 客户端自动探测可用服务地址
+# 轻量健康检查，供 Android 客户端自动探测可用服务地址；不做 I/O，直接在事件循环内返回，不占线程池
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
@@ -77,6 +80,17 @@ def _resolve_frontend_dist() -> Path:
     return (Path(__file__).parent / "webclient" / "out").resolve()
 
 
+@app.on_event("startup")
+async def _tune_threadpool():
+    """同步路由（DB/文件 I/O）都在 AnyIO 线程池里执行，默认 40 个令牌；并发高时缩略图/文件请求会排队。
+
+    可通过环境变量 MEDIA_APP_THREADPOOL_TOKENS 调整（默认 128）。
+    """
+    tokens = int(os.environ.get("MEDIA_APP_THREADPOOL_TOKENS", "128"))
+    anyio.to_thread.current_default_thread_limiter().total_tokens = tokens
+    print(f"[startup] 线程池令牌数: {tokens}")
+
+
 @app.on_event("startup")
 def _mount_static_frontend():
     target_dir = _resolve_frontend_dist()
@@ -311,4 +325,7 @@ if __name__ == "__main__":
 
     lan_ip = _get_local_ip()
     print(f"[boot] Media App API 即将启动: http://{lan_ip}:{port}  (本机: http://localhost:{port})")
-    uvicorn.run(app, host=host, port=port)
+    # 默认关闭访问日志：每个请求同步写一行 stdout，对 /gate、/tags 这类小接口开销明显；排查问题时设 MEDIA_APP_ACCESS_LOG=1
+    access_log = os.environ.get("MEDIA_APP_ACCESS_LOG", "0") == "1"
+    # uvicorn[standard] 已带 uvloop/httptools，loop/http 保持 auto 即可自动选用（Windows 无 uvloop 时用 asyncio）
+    uvicorn.run(app, host=host, port=port, access_log=access_log)
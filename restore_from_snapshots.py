@@ -6,6 +6,7 @@
 
 行为（默认）：
 - 删除根目录下：media_app.db、sample_media/、thumbnails/
+  （sample_media/ 与快照逐文件大小/mtime 一致时保留原目录，不再删除重拷）
 - 从快照目录复制：<snapshots>/media_app.db -> ./media_app.db
                  <snapshots>/sample_media/ -> ./sample_media/
 
@@ -18,6 +19,7 @@
 
 from __future__ import annotations
 from pathlib import Path
+import os
 import shutil
 import sys
 
@@ -36,6 +38,17 @@ def ensure_inside_repo(path: Path, repo_root: Path) -> None:
         raise RuntimeError(f"路径越界保护触发：{path} 不在仓库根目录内")
 
 
+def tree_signature(root: Path) -> dict[str, tuple[int, int]]:
+    """目录树内每个文件的 (大小, 秒级 mtime)；copy2/copytree 会保留 mtime，可据此判断是否与快照一致。"""
+    sig: dict[str, tuple[int, int]] = {}
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            st = os.stat(os.path.join(dirpath, name))
+            rel = os.path.relpath(os.path.join(dirpath, name), root)
+            sig[rel] = (st.st_size, int(st.st_mtime))
+    return sig
+
+
 def main() -> int:
     repo_root = Path(__file__).resolve().parent
     # 固定快照目录名：media_snapshots（无参数）
@@ -71,17 +84,20 @@ def main() -> int:
     print(f"  - 媒体目录: {human(media_dest)}  <=  {human(media_src)}")
     print(f"  - 清理缩略图: {human(thumbs_dir)}")
 
-    # 删除现有目标
+    # 删除现有目标（连同 WAL 旁路文件，避免旧的 -wal 被回放到恢复后的库上）
     try:
-        if db_dest.exists():
-            db_dest.unlink()
-            print(f"[remove] 删除 {human(db_dest)}")
+        for target in (db_dest, db_dest.with_name(db_dest.name + "-wal"), db_dest.with_name(db_dest.name + "-shm")):
+            if target.exists():
+                target.unlink()
+                print(f"[remove] 删除 {human(target)}")
     except Exception as e:
         print(f"❌ 删除数据库失败: {human(db_dest)} -> {e}")
         return 3
 
+    # 媒体目录与快照完全一致（上次恢复后未被改动）时不再删除重拷，这通常是整个恢复里最耗时的一步
+    media_clean = media_dest.is_dir() and tree_signature(media_dest) == tree_signature(media_src)
     try:
-        if media_dest.exists():
+        if media_dest.exists() and not media_clean:
             shutil.rmtree(media_dest)
             print(f"[remove] 删除 {human(media_dest)}/")
     except Exception as e:
@@ -103,6 +119,10 @@ def main() -> int:
         print(f"❌ 复制数据库失败: {human(db_src)} -> {human(db_dest)} : {e}")
         return 4
 
+    if media_clean:
+        print(f"[skip] {human(media_dest)} 与快照一致，跳过复制")
+        print("✅ 恢复完成。可以启动后端或重新运行测试。")
+        return 0
     try:
         shutil.copytree(media_src, media_dest)
         print(f"[copy] {human(media_src)} -> {human(media_dest)}")
@@ -37,7 +37,6 @@ Full scan smoke test for Media App.
 
 from __future__ import annotations
 
-import json
 import os
 import random
 import signal
@@ -47,15 +46,21 @@ import sys
 import time
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
-from urllib.error import URLError, HTTPError
 from urllib.parse import quote
-from urllib.request import Request, urlopen
+
+import requests
+from requests.adapters import HTTPAdapter
 
 
 API_BASE = os.environ.get("MEDIA_TEST_API_BASE", "http://127.0.0.1:8000")
 DEFAULT_MEDIA_ROOT = os.environ.get("MEDIA_TEST_ROOT", "/Users/wang/Desktop/所有图片")
 DB_PATH = os.environ.get("MEDIA_TEST_DB_PATH", "media_app.db")
 
+# 初始化流程 + 周期采样都打同一个后端：共用 keep-alive 连接，不再每次请求新建 TCP 连接
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+SESSION.headers["Accept"] = "application/json"
+
 
 @dataclass
 class SampleSnapshot:
@@ -82,16 +87,11 @@ class SampleSnapshot:
 
 def _http_json(method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Any:
     url = API_BASE.rstrip("/") + path
-    data: Optional[bytes] = None
-    headers = {"Content-Type": "application/json"}
-    if body is not None:
-        data = json.dumps(body).encode("utf-8")
-    req = Request(url, data=data, headers=headers, method=method)
-    with urlopen(req, timeout=10) as resp:
-        raw = resp.read()
-    if not raw:
+    resp = SESSION.request(method, url, json=body, timeout=10)
+    resp.raise_for_status()
+    if not resp.content:
         return None
-    return json.loads(raw.decode("utf-8"))
+    return resp.json()
 
 
 def _generate_session_seed() -> str:
@@ -108,7 +108,7 @@ def wait_for_health(timeout: float = 60.0) -> bool:
             data = _http_json("GET", "/health")
             if isinstance(data, dict) and data.get("status") == "ok":
                 return True
-        except (URLError, HTTPError, OSError):
+        except (requests.RequestException, OSError):
             pass
         time.sleep(1.0)
     return False
@@ -429,6 +429,7 @@ def main() -> int:
         print("[test] done. Check above timeline and backend.test.log for model activity.")
         return 0
     finally:
+        SESSION.close()
         print("[test] stopping backend...")
         stop_backend(proc)
 
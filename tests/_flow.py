@@ -0,0 +1,156 @@
+"""
+API 流程测试共用的 HTTP 工具（api_flow_test.py 等入口脚本复用）。
+
+- 全流程共用一个 keep-alive `requests.Session`（连接与地址探测见 `tests/_flow_net.py`）；
+- `http_call` / `http_json` 统一请求、日志与 JSON 解析（每个响应体只解析一次，日志格式见 `tests/_flow_log.py`）；
+- `TEST_VERBOSE=0` 时日志函数为空操作。
+
+BASE_URL 由入口脚本在启动时通过 `set_base_url` 确定。
+"""
+
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from urllib import parse
+
+import orjson
+
+from tests._flow_log import emit, format_http_error, format_request, format_response, response_json
+from tests._flow_net import SESSION, pin_resolved_host, select_base_url
+
+__all__ = [
+    "SESSION",
+    "VERBOSE",
+    "assert_true",
+    "build_url",
+    "emit",
+    "get_base_url",
+    "header_contains",
+    "http_call",
+    "http_json",
+    "http_json_cached",
+    "pin_resolved_host",
+    "response_json",
+    "select_base_url",
+    "set_base_url",
+]
+
+BASE_URL = os.environ.get("API_BASE_URL", "http://127.0.0.1:8000")
+VERBOSE = os.environ.get("TEST_VERBOSE", "1") != "0"
+
+# 本次运行内的 GET 结果缓存：(path, query) -> (resp, data)；任何写请求都会整体清空
+_GET_CACHE: Dict[tuple, tuple] = {}
+
+
+# ---------------------------------------------------------------------------
+# 服务地址
+# ---------------------------------------------------------------------------
+
+def get_base_url() -> str:
+    return BASE_URL
+
+
+def set_base_url(base: str) -> None:
+    global BASE_URL
+    BASE_URL = base.rstrip("/")
+
+
+# ---------------------------------------------------------------------------
+# 请求 / 日志
+# ---------------------------------------------------------------------------
+
+_urlencode = parse.urlencode
+
+
+@lru_cache(maxsize=256)
+def _build_url_cached(base: str, path: str, query_items: tuple) -> str:
+    return f"{base}{path}?{_urlencode(query_items)}"
+
+
+def build_url(path: str, query: Optional[Dict[str, Any]] = None) -> str:
+    if query:
+        # 流程里同一组参数（分页、轮询）会反复请求：按 (BASE_URL, path, 参数) 缓存拼好的 URL，
+        # BASE_URL 作为键的一部分，set_base_url 之后无需手动失效
+        return _build_url_cached(BASE_URL, path, tuple(query.items()))
+    return f"{BASE_URL}{path}"
+
+
+def http_call(
+    title: str,
+    method: str,
+    path: str,
+    query: Optional[Dict[str, Any]] = None,
+    json_body: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    allow_error: bool = False,
+    max_bytes: Optional[int] = None,
+    quiet: bool = False,
+):
+    """发起请求并返回 (resp, body)。
+
+    quiet=True 时不输出请求/成功响应日志，用于轮询这类只关心状态变化、由调用方自行打印差异的请求。
+
+    max_bytes 不为 None 时以 stream 方式请求，最多读取 max_bytes 字节后关闭连接：
+    - max_bytes=0：只读响应头，body 为 b""；用于只校验状态码/响应头的大文件请求；
+    - max_bytes>0：用于 Range 请求，服务端忽略 Range 返回整文件时也不会整个读进内存。
+    """
+    if method not in ("GET", "HEAD"):
+        _GET_CACHE.clear()
+    data = None
+    if json_body is not None:
+        # 请求体只用 orjson 序列化一次（直接得到 UTF-8 bytes），日志与发送共用同一份
+        data = orjson.dumps(json_body)
+    # 请求/响应日志攒成一块，请求结束后一次输出
+    request_log = format_request(title, method, path, query, data, headers) if VERBOSE and not quiet else None
+    if data is not None:
+        headers = {"Content-Type": "application/json", **(headers or {})}
+    url = build_url(path, query)
+    streamed = max_bytes is not None
+    resp = SESSION.request(method, url, data=data, headers=headers, timeout=30, stream=streamed)
+    if streamed:
+        body = resp.raw.read(max_bytes, decode_content=True) if max_bytes else b""
+        resp.close()
+    else:
+        body = resp.content
+    if resp.status_code < 400:
+        if request_log is not None:
+            emit(request_log + "\n" + format_response(resp, None if max_bytes == 0 else body))
+        return resp, body
+    if VERBOSE:
+        error_log = format_http_error(resp, body)
+        emit(error_log if request_log is None else request_log + "\n" + error_log)
+    if allow_error:
+        return resp, body
+    resp.raise_for_status()
+
+
+def http_json(title: str, method: str, path: str, **kwargs):
+    """http_call 的 JSON 版本，返回 (resp, data)。"""
+    resp, body = http_call(title, method, path, **kwargs)
+    return resp, response_json(resp, body)
+
+
+def http_json_cached(title: str, path: str, query: Optional[Dict[str, Any]] = None):
+    """GET 版 http_json，结果在两次写请求之间复用；用于 init-status、来源列表等反复读取的只读接口。"""
+    key = (path, tuple(sorted((query or {}).items())))
+    hit = _GET_CACHE.get(key)
+    if hit is None:
+        hit = http_json(title, "GET", path, query=query)
+        _GET_CACHE[key] = hit
+    elif VERBOSE:
+        emit(f"\n=== CACHED: {title} GET {path}")
+    return hit
+
+
+def assert_true(cond: bool, msg: str) -> None:
+    if not cond:
+        raise AssertionError(msg)
+
+
+def header_contains(resp, key: str, substr: str) -> bool:
+    """大小写不敏感地判断响应头包含子串（resp.headers 本身按键大小写不敏感）。"""
+    val = resp.headers.get(key)
+    return val is not None and substr.lower() in val.lower()
+
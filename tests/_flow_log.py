@@ -0,0 +1,82 @@
+"""
+API 流程测试的日志与 JSON 解析：请求/响应块的格式化、整块输出，以及按响应缓存的 JSON 解析。
+
+由 `tests/_flow.py` 引入并转出，入口脚本无需直接依赖本模块。
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional
+
+import orjson
+
+_MISSING = object()
+_LOG_JSON_MAX_BYTES = 64 * 1024
+_PRINT_LOCK = threading.Lock()
+
+
+def response_json(resp, body: bytes) -> Any:
+    """解析 JSON 响应体，结果缓存在 resp 上，日志与调用方共用一次解析。"""
+    cached = getattr(resp, "_flow_json", _MISSING)
+    if cached is _MISSING:
+        cached = orjson.loads(body)
+        resp._flow_json = cached
+    return cached
+
+
+def format_request(title: str, method: str, path: str, query: Optional[Dict[str, Any]] = None, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None) -> str:
+    lines = [
+        "\n=== REQUEST:",
+        f"- Title   : {title}",
+        f"- Method  : {method}",
+        f"- Path    : {path}",
+    ]
+    if query:
+        lines.append(f"- Query   : {orjson.dumps(query).decode()}")
+    if body is not None:
+        lines.append(f"- JSON    : {body.decode()}")
+    if headers:
+        lines.append(f"- Headers : {headers}")
+    return "\n".join(lines)
+
+
+def format_response(resp, body_bytes: Optional[bytes]) -> str:
+    ctype = resp.headers.get("Content-Type", "")
+    lines = [
+        "=== RESPONSE:",
+        f"- Status  : {resp.status_code}",
+        f"- Headers : Content-Type={ctype}",
+    ]
+    if body_bytes is None:
+        lines.append(f"- Bytes   : 未读取 (Content-Length={resp.headers.get('Content-Length')})")
+    # 按 Content-Type 分派：缩略图/媒体等二进制响应不做解码和 JSON 尝试
+    elif not body_bytes:
+        lines.append("- Body    : <empty>")
+    elif ctype.startswith("application/json") and len(body_bytes) >= _LOG_JSON_MAX_BYTES:
+        # 超大 JSON（如大页列表）不做缩进重排，只记录长度
+        lines.append(f"- JSON    : length={len(body_bytes)}（超过 {_LOG_JSON_MAX_BYTES} 字节，不展开）")
+    elif ctype.startswith("application/json"):
+        obj = response_json(resp, body_bytes)
+        lines.append("- JSON    :")
+        lines.append(orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode())
+    elif ctype.startswith("text/"):
+        lines.append(f"- Text    : {body_bytes[:512].decode('utf-8', errors='ignore')}")
+    else:
+        lines.append(f"- Bytes   : length={len(body_bytes)}")
+    return "\n".join(lines)
+
+
+def format_http_error(resp, body_bytes: bytes) -> str:
+    return "\n".join([
+        "=== RESPONSE (HTTPError):",
+        f"- Status  : {resp.status_code}",
+        f"- Reason  : {resp.reason}",
+        f"- Body    : {body_bytes[:512].decode('utf-8', errors='ignore')}",
+    ])
+
+
+def emit(text: str) -> None:
+    """整块输出日志：流程里有并发请求，同一请求的请求/响应块不能与其他线程的输出交错。"""
+    with _PRINT_LOCK:
+        print(text, flush=True)
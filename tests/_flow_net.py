@@ -0,0 +1,118 @@
+"""
+API 流程测试的连接层：共享的 keep-alive Session、服务地址探测与主机名预解析。
+
+由 `tests/_flow.py` 引入并转出，入口脚本无需直接依赖本模块。
+"""
+
+from __future__ import annotations
+
+import atexit
+import ipaddress
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any
+from urllib import parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class _NoDelayAdapter(HTTPAdapter):
+    """连接池里的 socket 开启 TCP_NODELAY，小 JSON 请求不再被 Nagle 攒包延迟。"""
+
+    _SOCKET_OPTIONS = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["socket_options"] = self._SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+# 全流程共用一个 keep-alive 连接池，避免每个请求重新建连
+SESSION = requests.Session()
+_ADAPTER = _NoDelayAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+SESSION.headers["Accept"] = "application/json"
+atexit.register(SESSION.close)
+
+
+def pin_resolved_host(base: str) -> str:
+    """把 base 中的主机名解析一次并换成 IP，Host 头保留原主机名；后续新建连接不再做 DNS 查询。"""
+    parts = parse.urlsplit(base)
+    host = parts.hostname
+    if not host:
+        return base
+    try:
+        ipaddress.ip_address(host)
+        return base
+    except ValueError:
+        pass
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        ip = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+    except OSError:
+        return base
+    literal = f"[{ip}]" if ":" in ip else ip
+    SESSION.headers["Host"] = parts.netloc
+    return parse.urlunsplit(parts._replace(netloc=f"{literal}:{port}" if parts.port else literal))
+
+
+@lru_cache(maxsize=1)
+def _get_lan_ip() -> str:
+    ip = "127.0.0.1"
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.connect(("8.8.8.8", 80))
+            ip = s.getsockname()[0]
+        finally:
+            s.close()
+    except Exception:
+        try:
+            ip = socket.gethostbyname(socket.gethostname())
+        except Exception:
+            pass
+    return ip
+
+
+def _probe_tcp(base: str, timeout: float = 1.0) -> bool:
+    parts = parse.urlsplit(base)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        with socket.create_connection((parts.hostname, port), timeout=timeout):
+            return True
+    except (OSError, ValueError):
+        return False
+
+
+def _probe_health(base: str, timeout: float = 1.5) -> bool:
+    # 走共享 Session：命中的候选地址连接直接留在池里，后续请求无需重新握手
+    try:
+        resp = SESSION.get(f"{base}/health", timeout=timeout)
+    except requests.RequestException:
+        return False
+    return 200 <= resp.status_code < 300
+
+
+def select_base_url(initial: str) -> str:
+    env = os.environ.get("API_BASE_URL")
+    if env:
+        return env.rstrip("/")
+    candidates = [
+        initial.rstrip("/"),
+        "http://localhost:8000",
+        f"http://{_get_lan_ip()}:8000",
+    ]
+    # 候选并发探测（先 TCP 连接筛掉不可达的，再发 /health），最坏耗时为单个超时而非累加；
+    # 结果仍按候选顺序取第一个可用的
+    with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+        ok = list(pool.map(lambda base: _probe_tcp(base) and _probe_health(base), candidates))
+    for base, reachable in zip(candidates, ok):
+        if reachable:
+            return base
+    return initial.rstrip("/")
@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def api_client():
+    """整个测试会话共用一个 TestClient（及其底层 httpx 连接池）。
+
+    不进入 `with TestClient(app)`：启动钩子会拉起资产流水线/自动扫描，单元测试不需要。
+    """
+    client = TestClient(app)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def fs_root_ref(api_client):
+    """把绝对路径转换成 /fs/* 接口使用的 (root_id, 相对路径)，以 "/" 根为基准。"""
+    roots = api_client.get("/fs/roots").json()
+    root_id = next(r for r in roots if r["abs_path"] == "/")["id"]
+
+    def to_ref(path: str) -> tuple[str, str]:
+        return root_id, path.lstrip("/")
+
+    return to_ref
@@ -0,0 +1,40 @@
+import os
+
+
+def test_fs_file_returns_304_when_etag_matches(api_client, fs_root_ref, tmp_path):
+    target = tmp_path / "note.txt"
+    target.write_text("hello", encoding="utf-8")
+    root_id, rel = fs_root_ref(str(target))
+
+    first = api_client.get("/fs/file", params={"root_id": root_id, "path": rel})
+    assert first.status_code == 200
+    assert first.content == b"hello"
+    etag = first.headers["etag"]
+
+    cached = api_client.get("/fs/file", params={"root_id": root_id, "path": rel}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    target.write_text("hello again", encoding="utf-8")
+    changed = api_client.get("/fs/file", params={"root_id": root_id, "path": rel}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.content == b"hello again"
+
+
+def test_fs_file_etag_changes_on_same_size_rewrite_within_one_second(api_client, fs_root_ref, tmp_path):
+    target = tmp_path / "note.txt"
+    target.write_text("hello", encoding="utf-8")
+    second_ns = (os.stat(target).st_mtime_ns // 1_000_000_000) * 1_000_000_000
+    os.utime(target, ns=(second_ns + 1_000, second_ns + 1_000))
+    root_id, rel = fs_root_ref(str(target))
+
+    first = api_client.get("/fs/file", params={"root_id": root_id, "path": rel})
+    etag = first.headers["etag"]
+
+    # 同一秒内写入等长内容：秒级 mtime 与大小都不变
+    target.write_text("world", encoding="utf-8")
+    os.utime(target, ns=(second_ns + 2_000, second_ns + 2_000))
+    changed = api_client.get("/fs/file", params={"root_id": root_id, "path": rel}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.content == b"world"
@@ -0,0 +1,43 @@
+import json
+
+
+def test_fs_list_cursor_pages_match_offset_pages(api_client, fs_root_ref, tmp_path):
+    for i in range(7):
+        (tmp_path / f"img_{i}.jpg").write_bytes(b"x")
+    (tmp_path / "notes.txt").write_text("skip", encoding="utf-8")
+    root_id, rel = fs_root_ref(str(tmp_path))
+    params = {"root_id": root_id, "path": rel, "limit": 3}
+
+    names: list[str] = []
+    cursor = None
+    while True:
+        body = api_client.get("/fs/list", params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        assert body["total"] == 7
+        names.extend(item["name"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert names == [f"img_{i}.jpg" for i in range(7)]
+    by_offset = api_client.get("/fs/list", params={**params, "offset": 3}).json()
+    assert [item["name"] for item in by_offset["items"]] == names[3:6]
+
+    resp = api_client.get("/fs/list", params={**params, "cursor": "missing.jpg"})
+    assert resp.status_code == 400
+
+
+def test_fs_list_stream_yields_same_entries_as_ndjson(api_client, fs_root_ref, tmp_path):
+    for i in range(5):
+        (tmp_path / f"img_{i}.jpg").write_bytes(b"x")
+    (tmp_path / "notes.txt").write_text("skip", encoding="utf-8")
+    root_id, rel = fs_root_ref(str(tmp_path))
+
+    resp = api_client.get("/fs/list-stream", params={"root_id": root_id, "path": rel})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    listed = api_client.get("/fs/list", params={"root_id": root_id, "path": rel}).json()["items"]
+    assert sorted(lines, key=lambda it: it["name"]) == listed
+
+    missing = api_client.get("/fs/list-stream", params={"root_id": root_id, "path": f"{rel}/nope"})
+    assert missing.status_code == 404
@@ -0,0 +1,72 @@
+import json
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import SessionLocal  # noqa: E402
+from app.db.bootstrap import create_database_and_tables  # noqa: E402
+from app.db.models_extra import ScanJob  # noqa: E402
+
+
+def _frames(text: str) -> list[dict]:
+    return [json.loads(line[len("data:"):]) for line in text.splitlines() if line.startswith("data:")]
+
+
+def test_scan_events_unknown_job_returns_404(api_client):
+    resp = api_client.get("/events/scan", params={"job_id": f"missing-{uuid.uuid4()}"})
+    assert resp.status_code == 404
+
+
+def test_scan_events_closes_after_terminal_state(api_client):
+    create_database_and_tables(echo=False)
+    job_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        db.add(ScanJob(job_id=job_id, source_id=1, state="completed", scanned_count=3, started_at=now, finished_at=now))
+        db.commit()
+    try:
+        resp = api_client.get("/events/scan", params={"job_id": job_id})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        frames = _frames(resp.text)
+        assert len(frames) == 1
+        assert frames[0]["jobId"] == job_id
+        assert frames[0]["state"] == "completed"
+        assert frames[0]["scannedCount"] == 3
+    finally:
+        with SessionLocal() as db:
+            db.query(ScanJob).filter(ScanJob.job_id == job_id).delete()
+            db.commit()
+
+
+def test_scan_status_etag_returns_304_when_unchanged(api_client):
+    create_database_and_tables(echo=False)
+    job_id = str(uuid.uuid4())
+    with SessionLocal() as db:
+        db.add(ScanJob(job_id=job_id, source_id=1, state="running", scanned_count=5, started_at=datetime.utcnow()))
+        db.commit()
+    try:
+        first = api_client.get("/scan/status", params={"job_id": job_id})
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        unchanged = api_client.get("/scan/status", params={"job_id": job_id}, headers={"If-None-Match": etag})
+        assert unchanged.status_code == 304
+        assert unchanged.content == b""
+
+        with SessionLocal() as db:
+            db.query(ScanJob).filter(ScanJob.job_id == job_id).update({"state": "completed", "scanned_count": 6})
+            db.commit()
+        changed = api_client.get("/scan/status", params={"job_id": job_id}, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.json()["state"] == "completed"
+        assert changed.headers["etag"] != etag
+    finally:
+        with SessionLocal() as db:
+            db.query(ScanJob).filter(ScanJob.job_id == job_id).delete()
+            db.commit()
@@ -0,0 +1,50 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.api import events_routes  # noqa: E402
+
+
+def test_task_snapshot_hub_polls_once_for_all_subscribers(monkeypatch):
+    calls = {"scan": 0, "asset": 0}
+
+    def fake_scan(_refresh):
+        calls["scan"] += 1
+        return SimpleNamespace(model_dump=lambda mode: {"state": "ready"})
+
+    def fake_asset():
+        calls["asset"] += 1
+        return SimpleNamespace(model_dump=lambda mode: {"started": True})
+
+    monkeypatch.setattr(events_routes, "get_scan_progress", fake_scan)
+    monkeypatch.setattr(events_routes, "get_asset_pipeline_status", fake_asset)
+    hubs: dict = {}
+    monkeypatch.setattr(events_routes, "_task_hubs", hubs)
+
+    async def scenario() -> tuple[str, str, str, bool]:
+        hub = hubs[200] = events_routes._TaskSnapshotHub(interval_ms=200)
+        first = hub.subscribe()
+        second = hub.subscribe()
+        frame_a = await asyncio.wait_for(first.get(), timeout=2)
+        frame_b = await asyncio.wait_for(second.get(), timeout=2)
+        # 后加入的连接立即拿到最近一帧，不额外触发快照计算
+        late = hub.subscribe()
+        frame_c = late.get_nowait()
+        task = hub.task
+        for queue in (first, second, late):
+            hub.unsubscribe(queue)
+        await asyncio.sleep(0)
+        return frame_a, frame_b, frame_c, task.cancelled() or task.done()
+
+    frame_a, frame_b, frame_c, stopped = asyncio.run(scenario())
+    assert frame_a == frame_b == frame_c
+    assert frame_a.startswith("event: snapshot\n")
+    assert calls == {"scan": 1, "asset": 1}
+    assert stopped
+    # 最后一个订阅者离开后 hub 从表中移除
+    assert hubs == {}
@@ -4,7 +4,6 @@ import sys
 from pathlib import Path
 
 import pytest
-from fastapi.testclient import TestClient
 
 ROOT = Path(__file__).resolve().parents[2]
 if str(ROOT) not in sys.path:
@@ -12,7 +11,6 @@ if str(ROOT) not in sys.path:
 
 from app.api.upload_routes import get_upload_service  # noqa: E402
 from app.services.upload_service import UploadService, _sha256_file  # noqa: E402
-from main import app  # noqa: E402
 
 
 @pytest.fixture()
@@ -24,12 +22,12 @@ def tmp_incoming_dir(tmp_path, monkeypatch):
 
 
 @pytest.fixture()
-def client(tmp_incoming_dir):
+def client(api_client, tmp_incoming_dir):
     incoming, tmp_upload = tmp_incoming_dir
     service = UploadService(incoming_dir=incoming, tmp_root=tmp_upload)
-    app.dependency_overrides[get_upload_service] = lambda: service
-    yield TestClient(app)
-    app.dependency_overrides.pop(get_upload_service, None)
+    api_client.app.dependency_overrides[get_upload_service] = lambda: service
+    yield api_client
+    api_client.app.dependency_overrides.pop(get_upload_service, None)
 
 
 def test_upload_whole_flow(client, tmp_incoming_dir):
@@ -0,0 +1,34 @@
+import threading
+
+from app.services import face_warmup
+from app.services.face_cluster_progress import FaceProgressState, get_face_progress
+
+
+def test_warmup_and_manual_rebuild_share_one_slot(monkeypatch):
+    counting = threading.Event()
+    release = threading.Event()
+
+    def slow_warmup(similarity_threshold):
+        counting.set()
+        release.wait(2)
+        get_face_progress().done(message="ok")
+        return (0, 0, 0, "", "v")
+
+    monkeypatch.setattr(face_warmup, "_run_warmup_face_clusters", slow_warmup)
+    get_face_progress().reset()
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(face_warmup.warmup_rebuild_face_clusters("/media")))
+    worker.start()
+    try:
+        assert counting.wait(2)
+        # 暖机还在统计/聚类时：进度已是 RUNNING，手动重建与第二轮暖机都被拒绝
+        assert get_face_progress().snapshot().state == FaceProgressState.RUNNING
+        assert face_warmup.submit_rebuild_face_clusters("/media", 0.65) is False
+        assert face_warmup.warmup_rebuild_face_clusters("/media") is None
+    finally:
+        release.set()
+        worker.join(2)
+
+    assert results == [(0, 0, 0, "", "v")]
+    get_face_progress().reset()
@@ -0,0 +1,15 @@
+from app.services import filesystem_browser as fb
+
+
+def test_list_subdirectories_cache_follows_directory_mtime(tmp_path):
+    (tmp_path / "b").mkdir()
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / "file.jpg").write_bytes(b"x")
+
+    first = fb.list_subdirectories(str(tmp_path))
+    assert [e.name for e in first] == ["b"]
+    assert fb.list_subdirectories(str(tmp_path)) is first
+
+    # 新建子目录会改变目录 mtime，缓存立即失效
+    (tmp_path / "a").mkdir()
+    assert [e.name for e in fb.list_subdirectories(str(tmp_path))] == ["a", "b"]
@@ -0,0 +1,45 @@
+import threading
+import time
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_for_same_key_run_once_and_share_result():
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "thumb"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("a", work)))
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=lambda: results.append(flights.do("a", work))) for _ in range(4)]
+    for t in followers:
+        t.start()
+    for t in [leader, *followers]:
+        t.join(2)
+
+    assert calls == [1]
+    assert results == ["thumb"] * 5
+    # 调用结束后不缓存结果：再次调用会重新执行
+    assert flights.do("a", work) == "thumb"
+    assert len(calls) == 2
+
+
+def test_exception_is_raised_to_caller_and_key_is_released():
+    flights = SingleFlight()
+
+    def boom():
+        raise ValueError("decode failed")
+
+    with pytest.raises(ValueError):
+        flights.do("b", boom)
+    assert flights.do("b", lambda: 1) == 1
@@ -0,0 +1,37 @@
+from app.services.sources import smb_validate
+
+
+def _fake_share(tree: dict):
+    def list_dir(_tree, path):
+        node = tree
+        for part in filter(None, path.split("\\")):
+            node = node[part]
+        return [(name, isinstance(child, dict)) for name, child in node.items()]
+
+    return list_dir
+
+
+def test_sample_media_walks_all_levels_and_marks_exact(monkeypatch):
+    share = {"a.jpg": None, "notes.txt": None, "sub": {"b.mp4": None, "deep": {"c.png": None}}}
+    monkeypatch.setattr(smb_validate, "_list_dir", _fake_share({"photos": share}))
+
+    result = smb_validate.sample_media(object(), "photos", "smb://nas/share/photos/")
+
+    assert result.total == 4
+    assert sorted(result.samples) == [
+        "smb://nas/share/photos/a.jpg",
+        "smb://nas/share/photos/sub/b.mp4",
+        "smb://nas/share/photos/sub/deep/c.png",
+    ]
+    assert result.exact
+
+
+def test_sample_media_stops_at_file_cap(monkeypatch):
+    share = {f"img_{i}.txt": None for i in range(30)}
+    monkeypatch.setattr(smb_validate, "_list_dir", _fake_share(share))
+    monkeypatch.setattr(smb_validate, "_MAX_FILES", 10)
+
+    result = smb_validate.sample_media(object(), "", "smb://nas/share/")
+
+    assert result.total == 10
+    assert not result.exact
@@ -0,0 +1,68 @@
+import asyncio
+import sys
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.db import SessionLocal, TagDefinition  # noqa: E402
+from app.db.bootstrap import create_database_and_tables  # noqa: E402
+from app.services import tag_events  # noqa: E402
+
+
+def _add_tag(name: str, *, commit: bool) -> None:
+    with SessionLocal() as db:
+        db.add(TagDefinition(name=name))
+        db.flush()
+        if commit:
+            db.commit()
+        else:
+            db.rollback()
+
+
+def _delete_tag(name: str) -> None:
+    with SessionLocal() as db:
+        db.query(TagDefinition).filter(TagDefinition.name == name).delete()
+        db.commit()
+
+
+def test_commit_in_worker_thread_wakes_subscriber():
+    create_database_and_tables(echo=False)
+    name = f"evt-{uuid.uuid4().hex[:8]}"
+
+    async def scenario() -> tuple[bool, bool]:
+        signal = tag_events.subscribe()
+        try:
+            await asyncio.to_thread(_add_tag, name + "-rb", commit=False)
+            await asyncio.sleep(0.05)
+            after_rollback = signal.is_set()
+            await asyncio.to_thread(_add_tag, name, commit=True)
+            await asyncio.wait_for(signal.wait(), timeout=2)
+            return after_rollback, signal.is_set()
+        finally:
+            tag_events.unsubscribe(signal)
+
+    try:
+        after_rollback, after_commit = asyncio.run(scenario())
+        assert after_rollback is False
+        assert after_commit is True
+    finally:
+        _delete_tag(name)
+
+
+def test_tags_version_bumps_on_commit_not_on_rollback():
+    create_database_and_tables(echo=False)
+    name = f"ver-{uuid.uuid4().hex[:8]}"
+
+    start = tag_events.tags_version()
+    _add_tag(name + "-rb", commit=False)
+    assert tag_events.tags_version() == start
+
+    _add_tag(name, commit=True)
+    added = tag_events.tags_version()
+    assert added > start
+
+    _delete_tag(name)
+    assert tag_events.tags_version() > added
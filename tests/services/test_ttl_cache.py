@@ -0,0 +1,19 @@
+from app.services import ttl_cache as ttl_module
+
+
+def test_ttl_cache_reuses_value_until_expiry_or_invalidate(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ttl_module.time, "monotonic", lambda: now[0])
+    calls: list[int] = []
+
+    @ttl_module.ttl_cache(30.0)
+    def load() -> list[int]:
+        calls.append(1)
+        return [len(calls)]
+
+    assert load() == [1]
+    assert load() == [1]
+    now[0] += 31
+    assert load() == [2]
+    load.invalidate()
+    assert load() == [3]